@@ -0,0 +1,74 @@
+import bisect
+import difflib
+from collections import Counter
+
+def normalize_team(name):
+    return " ".join(str(name).lower().split())
+
+class OpponentStats:
+    def __init__(self):
+        # normalized team name -> running aggregates over every matchresults row
+        self.teams = {}
+        self.sorted_keys = []
+
+    def load(self, rows):
+        self.teams = {}
+        self.sorted_keys = []
+        for row in rows:
+            self.add_result(row)
+
+    def add_result(self, row):
+        # matchresults row: timestamp, submitter, match id, maps won, maps lost, players, cb, enemy team
+        if len(row) < 8 or not str(row[7]).strip():
+            return
+        key = normalize_team(row[7])
+        stats = self.teams.get(key)
+        if stats is None:
+            stats = {
+                "name": str(row[7]).strip(),
+                "maps_won": Counter(),
+                "maps_lost": Counter(),
+                "matches": 0,
+                "last_played": ""
+            }
+            self.teams[key] = stats
+            bisect.insort(self.sorted_keys, key)
+        stats["matches"] += 1
+        for map_name in str(row[3]).split(","):
+            if map_name.strip():
+                stats["maps_won"][map_name.strip()] += 1
+        for map_name in str(row[4]).split(","):
+            if map_name.strip():
+                stats["maps_lost"][map_name.strip()] += 1
+        played = str(row[0]).split(" ")[0]
+        if played > stats["last_played"]:
+            stats["last_played"] = played
+
+    def prefix_matches(self, query, limit=25):
+        query = normalize_team(query)
+        start = bisect.bisect_left(self.sorted_keys, query)
+        matches = []
+        for key in self.sorted_keys[start:]:
+            if not key.startswith(query) or len(matches) >= limit:
+                break
+            matches.append(key)
+        return matches
+
+    def search(self, query, limit=25):
+        # Prefix hits first, then fuzzy ones, as display names
+        keys = self.prefix_matches(query, limit)
+        if len(keys) < limit and query.strip():
+            for key in difflib.get_close_matches(normalize_team(query), self.sorted_keys, n=limit, cutoff=0.6):
+                if key not in keys:
+                    keys.append(key)
+        return [self.teams[key]["name"] for key in keys[:limit]]
+
+    def resolve(self, query):
+        key = normalize_team(query)
+        if key in self.teams:
+            return self.teams[key]
+        prefixed = self.prefix_matches(key, limit=2)
+        if len(prefixed) == 1:
+            return self.teams[prefixed[0]]
+        close = difflib.get_close_matches(key, self.sorted_keys, n=1, cutoff=0.8)
+        return self.teams[close[0]] if close else None
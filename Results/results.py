@@ -4,19 +4,20 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import os
-import json
-import base64
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
+import asyncio
 from datetime import datetime
-from collections import defaultdict
+from Results.opponents import OpponentStats
+from shared.sheets import append_rows_request, delete_rows_requests
+from shared.reaper import reap_messages
+from shared.matches import MATCH_ID_COL
+from shared.lineups import lineup_entry, MATCH_ID_COL as LINEUP_MATCH_ID_COL
+from shared.prompts import PromptAsset
 
 class MatchResultsModal(discord.ui.Modal, title="AOS MATCH RESULTS"):
-    def __init__(self, match_sheet, result_sheet):
+    def __init__(self, cog):
         super().__init__()
-        self.match_sheet = match_sheet
-        self.result_sheet = result_sheet
+        self.cog = cog
+        self.sheets = cog.sheets
 
         self.match_id = discord.ui.TextInput(label="SCHEDULED MATCH ID", required=True)
         self.maps_won = discord.ui.TextInput(label="Maps Won", required=True)
@@ -31,35 +32,36 @@ class MatchResultsModal(discord.ui.Modal, title="AOS MATCH RESULTS"):
         self.add_item(self.cb_results)
 
     async def on_submit(self, interaction: discord.Interaction):
+        match_id_val = self.match_id.value.strip().lower()
+        claimed = posted = False
         try:
             user = interaction.user
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            match_id_val = self.match_id.value.strip().lower()
 
             results_channel = interaction.client.get_channel(1361457240929996980)
             if not results_channel:
                 await interaction.response.send_message("❌ Results channel not found.", ephemeral=True)
                 return
 
-            submitted_data = self.result_sheet.get_all_records()
-            for row in submitted_data:
-                existing_id = str(row.get("Match Id", "")).strip().lower()
-                if existing_id == match_id_val:
-                    await interaction.response.send_message("HEY DUMBFUCK THIS WAS ALREADY SUBMITTED", ephemeral=True)
-                    return
+            if match_id_val in self.cog.submitted_ids:
+                await interaction.response.send_message("HEY DUMBFUCK THIS WAS ALREADY SUBMITTED", ephemeral=True)
+                return
 
-            match_data = self.match_sheet.get_all_records()
-            match_row = next((row for row in match_data if str(row.get("Match ID", "")).strip() == self.match_id.value.strip()), None)
+            # Claim the ID before any await so a double-click can't submit it twice
+            self.cog.submitted_ids.add(match_id_val)
+            claimed = True
 
+            match_row = await self.cog.bot.matches.lookup(self.match_id.value.strip())
             if not match_row:
+                self.cog.submitted_ids.discard(match_id_val)
                 await interaction.response.send_message(f"❌ Match ID {self.match_id.value.strip()} not found in schedule.", ephemeral=True)
                 return
 
-            date = match_row["Date"]
-            time = match_row["Time"]
-            enemy_team = match_row["Enemy Team"]
-            league = match_row["League"]
-            match_type = match_row["Match Type"]
+            date = match_row[2]
+            time = match_row[3]
+            enemy_team = match_row[4]
+            league = match_row[5]
+            match_type = match_row[6]
 
             header_emoji = "<a:BlackCrown:1353482149096853606>"
             section_emoji = "<a:ShadowJam:1357240936849211583>"
@@ -75,48 +77,10 @@ class MatchResultsModal(discord.ui.Modal, title="AOS MATCH RESULTS"):
 {submitter_emoji} **SUBMITTED BY:** <@{user.id}>"""
 
             await results_channel.send(combined_message)
+            posted = True
             await interaction.response.send_message("✅ Match results submitted!", ephemeral=True)
 
-            # Cleanup matches and lineups after submission
-            try:
-                lineup_sheet = self.match_sheet.spreadsheet.worksheet("lineups")
-                lineup_rows = lineup_sheet.get_all_values()
-                for idx, row in enumerate(lineup_rows[1:], start=2):
-                    if (row[1].strip().lower() == match_id_val and
-                        row[2].strip().lower() == enemy_team.lower() and
-                        row[3].strip().lower() == league.lower()):
-                        msg_id = row[13].strip()
-                        chan_id = row[14].strip()
-                        try:
-                            chan = interaction.client.get_channel(int(chan_id))
-                            if chan:
-                                msg = await chan.fetch_message(int(msg_id))
-                                await msg.delete()
-                        except:
-                            pass
-                        lineup_sheet.delete_rows(idx)
-                        break
-
-                match_rows = self.match_sheet.get_all_values()
-                for idx, row in enumerate(match_rows[1:], start=2):
-                    if (row[8].strip().lower() == match_id_val and
-                        row[4].strip().lower() == enemy_team.lower() and
-                        row[5].strip().lower() == league.lower()):
-                        msg_id = row[9].strip()
-                        chan_id = row[10].strip()
-                        try:
-                            chan = interaction.client.get_channel(int(chan_id))
-                            if chan:
-                                msg = await chan.fetch_message(int(msg_id))
-                                await msg.delete()
-                        except:
-                            pass
-                        self.match_sheet.delete_rows(idx)
-                        break
-            except Exception as cleanup_error:
-                print(f"Cleanup error: {cleanup_error}")
-
-            self.result_sheet.append_row([
+            result_row = [
                 timestamp,
                 user.name,
                 self.match_id.value.strip(),
@@ -125,92 +89,134 @@ class MatchResultsModal(discord.ui.Modal, title="AOS MATCH RESULTS"):
                 self.aos_players.value.strip(),
                 cb_outcome,
                 enemy_team
-            ])
+            ]
+            await self.cog.record_result(match_row, result_row)
         except Exception as e:
+            if claimed and not posted:
+                self.cog.submitted_ids.discard(match_id_val)
             if not interaction.response.is_done():
                 await interaction.response.send_message(f"❌ Modal error: {e}", ephemeral=True)
             else:
                 await interaction.followup.send(f"❌ Modal error: {e}", ephemeral=True)
 
+def match_messages(match_row, lineup_entries):
+    # (channel_id, message_id) of the schedule post and every live lineup post for a match
+    messages = [(chan_id, msg_id) for _, msg_id, chan_id in lineup_entries]
+    if len(match_row) > 10:
+        messages.append((match_row[10].strip(), match_row[9].strip()))
+    return [(c, m) for c, m in messages if c.isdigit() and m.isdigit()]
+
 class MatchResultsButton(discord.ui.View):
-    def __init__(self, match_sheet, result_sheet):
+    def __init__(self, cog):
         super().__init__(timeout=None)
-        self.match_sheet = match_sheet
-        self.result_sheet = result_sheet
+        self.cog = cog
 
     @discord.ui.button(label="AOS MATCH RESULTS", style=discord.ButtonStyle.danger, custom_id="match_results_button")
     async def open_modal(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(MatchResultsModal(self.match_sheet, self.result_sheet))
+        await interaction.response.send_modal(MatchResultsModal(self.cog))
 
 class MatchResults(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_b64 = os.getenv("GOOGLE_SHEETS_CREDS_B64")
-        creds_json = json.loads(base64.b64decode(creds_b64.encode("utf-8")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.client = gspread.authorize(creds)
-        self.match_sheet = self.client.open("AOS").worksheet("matches")
-        self.result_sheet = self.client.open("AOS").worksheet("matchresults")
+        self.sheets = bot.sheets
+        # Lower-cased match IDs already in matchresults
+        self.submitted_ids = set()
+        # Per-enemy-team map/match aggregates for /spy
+        self.opponents = OpponentStats()
+        self.prompt_image = PromptAsset(os.path.join(os.path.dirname(__file__), "matchresults.png"))
+
+    async def record_result(self, match_row, result_row):
+        # One values:batchGet of lineups + matches to find this match's rows as they are now (both tabs get hand
+        # edits), then one batchUpdate that deletes them and logs the result
+        match_id = result_row[2].strip()
+        lineups, matches = self.bot.lineups, self.bot.matches
+        stale = False
+        try:
+            async with lineups.lock, matches.lock:
+                lineup_values, match_values = await self.sheets.batch_get(["'lineups'", "'matches'"])
+                lineup_entries = [
+                    lineup_entry(i, row) for i, row in enumerate(lineup_values[1:], start=2)
+                    if len(row) > LINEUP_MATCH_ID_COL and row[LINEUP_MATCH_ID_COL].strip() == match_id
+                ]
+                match_rows = [
+                    (i, row) for i, row in enumerate(match_values[1:], start=2)
+                    if len(row) > MATCH_ID_COL and row[MATCH_ID_COL].strip() == match_id
+                ]
+                lineups_id, matches_id, results_id = await asyncio.gather(
+                    self.sheets.sheet_id("lineups"), self.sheets.sheet_id("matches"), self.sheets.sheet_id("matchresults")
+                )
+                requests = delete_rows_requests(lineups_id, [row for row, _, _ in lineup_entries])
+                requests += delete_rows_requests(matches_id, [i for i, _ in match_rows])
+                requests.append(append_rows_request(results_id, [result_row]))
+                await self.sheets.batch_update(requests)
+
+                # Keep the indexes if they agreed with the sheet; otherwise rebuild them once the locks are free
+                if sorted(row for row, _, _ in lineups.get(match_id)) == [row for row, _, _ in lineup_entries]:
+                    lineups.forget(match_id)
+                else:
+                    stale = True
+                cached = matches.row_number(match_id)
+                if ([cached] if cached else []) == [i for i, _ in match_rows]:
+                    matches.remove(match_id)
+                else:
+                    stale = True
+                if match_rows:
+                    match_row = match_rows[0][1]
+        except Exception as e:
+            print(f"Cleanup error: {e}")
+            await self.sheets.append("matchresults", [result_row])
+            self.opponents.add_result(result_row)
+            return
+        if stale:
+            print("⚠️ Match/lineup indexes were out of step with the sheet; reloading")
+            await asyncio.gather(lineups.load(force=True), matches.load(force=True))
+        self.opponents.add_result(result_row)
+        await reap_messages(self.bot, match_messages(match_row, lineup_entries))
+
+    async def cog_load(self):
+        try:
+            await asyncio.gather(self.bot.matches.load(), self.bot.lineups.load())
+            rows = (await self.sheets.read("matchresults"))[1:]
+            self.submitted_ids = {row[2].strip().lower() for row in rows if len(row) > 2 and row[2].strip()}
+            self.opponents.load(rows)
+        except Exception as e:
+            print(f"❌ Failed to load match result indexes: {e}")
 
     @app_commands.command(name="matchresultsprompt", description="Send AOS match results prompt")
     async def matchresultsprompt(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        channel = interaction.channel
-        try:
-            async for msg in channel.history(limit=10):
-                if msg.author.id == interaction.client.user.id and (msg.attachments or msg.components):
-                    await msg.delete()
-        except Exception as e:
-            print(f"⚠️ Cleanup error: {e}")
-        image_path = os.path.join(os.path.dirname(__file__), "matchresults.png")
-        file = discord.File(fp=image_path, filename="matchresults.png")
-        await channel.send(file=file)
-        await channel.send(view=MatchResultsButton(self.match_sheet, self.result_sheet))
+        await self.bot.prompts.post(self.bot, "matchresults", interaction.channel, self.prompt_image, MatchResultsButton(self))
         await interaction.followup.send("✅ Prompt sent.", ephemeral=True)
 
     @app_commands.command(name="spy", description="Spy on enemy team results")
     @app_commands.describe(enemy_team="Enemy team name to search for")
     async def spy(self, interaction: discord.Interaction, enemy_team: str):
-        await interaction.response.defer()
         try:
-            enemy_team = enemy_team.strip().lower()
-            records = self.result_sheet.get_all_values()[1:]
-            matched = [row for row in records if row[7].strip().lower() == enemy_team]
-            if not matched:
-                await interaction.followup.send(f"❌ No match results found for `{enemy_team}`")
+            stats = self.opponents.resolve(enemy_team)
+            if not stats:
+                await interaction.response.send_message(f"❌ No match results found for `{enemy_team.strip().lower()}`")
                 return
 
             spy_emoji = "<a:Spy_Kids_Glasses_Check:1372752191198068796>"
             cheer_emoji = "<a:cheers:1372752619159945226>"
             angry_emoji = "<a:angry:1372752617641349120>"
-            header = f"# {spy_emoji} SPY NETWORK ({enemy_team.upper()}) {spy_emoji}\n\n"
+            header = f"# {spy_emoji} SPY NETWORK ({stats['name'].upper()}) {spy_emoji}\n\n"
+            summary = f"**MATCHES:** {stats['matches']} | **LAST PLAYED:** {stats['last_played'] or 'Unknown'}\n\n"
 
-
-            maps_won_group = defaultdict(list)
-            for row in matched:
-                for map in row[3].split(','):
-                    map = map.strip()
-                    if map:
-                        maps_won_group[map].append(map)
-            maps_won = '\n'.join(f"{cheer_emoji} {', '.join(group)}" for group in maps_won_group.values()) or 'None'
-
-            maps_lost_group = defaultdict(list)
-            for row in matched:
-                for map in row[4].split(','):
-                    map = map.strip()
-                    if map:
-                        maps_lost_group[map].append(map)
-            maps_lost = '\n'.join(f"{angry_emoji} {', '.join(group)}" for group in maps_lost_group.values()) or 'None'
+            maps_won = '\n'.join(f"{cheer_emoji} {', '.join([map] * count)}" for map, count in stats["maps_won"].items()) or 'None'
+            maps_lost = '\n'.join(f"{angry_emoji} {', '.join([map] * count)}" for map, count in stats["maps_lost"].items()) or 'None'
 
             body = f"**MAPS WON:**\n{maps_won}\n\n**MAPS LOST:**\n{maps_lost}"
-            await interaction.followup.send(header + body)
+            await interaction.response.send_message(header + summary + body)
         except Exception as e:
-            await interaction.followup.send(f"❌ SPY command failed: {e}")
+            await interaction.response.send_message(f"❌ SPY command failed: {e}")
+
+    @spy.autocomplete("enemy_team")
+    async def spy_team_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=name, value=name) for name in self.opponents.search(current)]
 
 # Register View + Cog
 async def setup(bot):
     cog = MatchResults(bot)
     await bot.add_cog(cog)
-    bot.add_view(MatchResultsButton(cog.match_sheet, cog.result_sheet))
+    bot.add_view(MatchResultsButton(cog))
@@ -1,73 +1,158 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-from datetime import datetime, timedelta
-import os
+from datetime import datetime, timedelta, time
 import json
-import base64
 import asyncio
 from pathlib import Path
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
-from collections import deque, defaultdict
+from collections import deque
+from availablescheduler.journal import ReactionJournal
+from availablescheduler.buffer import ReactionBuffer
+from availablescheduler.counts import AvailabilityCounts, DAYS, TIMES
+from shared.reaper import reap_messages
+from shared.sheets import append_rows_request, delete_rows_requests
 
 class AvailabilityScheduler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.reaction_queue = deque()
         self.write_lock = asyncio.Lock()
+        self.sheets = bot.sheets
+        # message_id -> {league, channel_id, label} for every live availability post
+        self.tracked_messages = {}
+        self.journal = ReactionJournal("reaction_journal.jsonl")
+        self.buffer = ReactionBuffer()
+        self.counts = AvailabilityCounts()
+        self.import_legacy_cache()
 
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_json = json.loads(base64.b64decode(os.getenv("GOOGLE_SHEETS_CREDS_B64")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.gc = gspread.authorize(creds)
-        self.sheet = self.gc.open("AOS").worksheet("availability")
-        self.current_sheet = self.gc.open("AOS").worksheet("currentavailability")
+    def import_legacy_cache(self):
+        # One-time move of anything left in the old rewrite-everything cache into the journal
+        cache_path = Path("reaction_cache.json")
+        if not cache_path.exists():
+            return
+        try:
+            with cache_path.open("r") as f:
+                data = json.load(f)
+            for entry in data:
+                self.journal.append(entry)
+            cache_path.unlink()
+            print(f"📝 Imported {len(data)} reactions from reaction_cache.json")
+        except Exception as e:
+            print(f"❌ Failed to import reaction_cache.json: {e}")
 
     def cache_reaction(self, entry):
-        cache_path = Path("reaction_cache.json")
         try:
-            if cache_path.exists():
-                with cache_path.open("r") as f:
-                    data = json.load(f)
-            else:
-                data = []
-            data.append(entry)
-            with cache_path.open("w") as f:
-                json.dump(data, f)
+            self.journal.append(entry)
+            self.buffer.record(entry)
+            self.counts.apply(entry)
             print(f"📝 Cached reaction: {entry}")
         except Exception as e:
             print(f"❌ Failed to cache reaction: {e}")
 
+    def replay_journal(self):
+        entries, _ = self.journal.pending()
+        for entry in entries:
+            self.buffer.record(entry)
+            if entry["message_id"] in self.tracked_messages:
+                self.counts.apply(entry)
+        if entries:
+            print(f"📝 Replayed {len(entries)} journaled reactions ({len(self.buffer)} net changes)")
+
     @tasks.loop(seconds=30)
     async def batch_writer(self):
+        await self.flush_journal()
+
+    async def flush_journal(self):
         async with self.write_lock:
-            cache_path = Path("reaction_cache.json")
-            if not cache_path.exists():
+            offset = self.journal.position()
+            if not self.buffer and offset == self.journal.cursor:
                 return
+            # Net changes only; anything for a post that has since been deleted is dropped
+            snapshot = {
+                key: entry for key, entry in self.buffer.take().items()
+                if entry["message_id"] in self.tracked_messages
+            }
             try:
-                with cache_path.open("r") as f:
-                    data = json.load(f)
-                if not data:
-                    return
-                rows = [
-                    [r["timestamp"], r["user_name"], r["user_id"], r["emoji"], r["message_id"], r["message_text"], r["league"]]
-                    for r in data
-                ]
-                self.sheet.append_rows(rows)
-                print(f"📤 Attempting to upload {len(rows)} cached reactions...")
-                with cache_path.open("w") as f:
-                    json.dump([], f)
+                removes = {key for key, entry in snapshot.items() if entry.get("event") == "remove"}
+                adds = [entry for entry in snapshot.values() if entry.get("event", "add") == "add"]
+
+                # Net removes and net adds go out together in one batchUpdate
+                sheet_id = await self.sheets.sheet_id("availability")
+                requests = []
+                to_delete = []
+                if removes:
+                    avail_rows = await self.sheets.read("availability")
+                    for i, row in enumerate(avail_rows[1:], start=2):
+                        key = (row[2], row[3], row[4]) if len(row) >= 7 else None
+                        if key in removes:
+                            to_delete.append(i)
+                            removes.discard(key)
+                    requests += delete_rows_requests(sheet_id, to_delete)
+
+                if adds:
+                    rows = [
+                        [r["timestamp"], r["user_name"], r["user_id"], r["emoji"], r["message_id"], r["message_text"], r["league"]]
+                        for r in adds
+                    ]
+                    requests.append(append_rows_request(sheet_id, rows))
+
+                await self.sheets.batch_update(requests)
+                if to_delete or adds:
+                    print(f"📤 Flushed availability: +{len(adds)} / -{len(to_delete)} reactions")
+
+                self.journal.commit(offset)
             except Exception as e:
+                self.buffer.restore(snapshot)
                 print(f"❌ Failed to flush reactions to sheet: {e}")
 
+    async def load_tracked_messages(self):
+        rows = (await self.sheets.read("currentavailability"))[1:]
+        self.tracked_messages = {}
+        for row in rows:
+            if len(row) >= 4:
+                self.track_message(row[0], row[1], row[2], row[3])
+        print(f"📌 Tracking {len(self.tracked_messages)} availability messages")
+
+    def track_message(self, league, channel_id, message_id, label):
+        self.tracked_messages[str(message_id)] = {
+            "league": league,
+            "channel_id": str(channel_id),
+            "label": label
+        }
+
+    def untrack_messages(self, message_ids):
+        for msg_id in message_ids:
+            self.tracked_messages.pop(str(msg_id), None)
+
     async def cog_load(self):
+        try:
+            await self.load_tracked_messages()
+        except Exception as e:
+            print(f"❌ Failed to load currentavailability: {e}")
+        try:
+            self.counts.rebuild((await self.sheets.read("availability"))[1:])
+        except Exception as e:
+            print(f"❌ Failed to load availability counts: {e}")
+        # Replay anything a previous run journaled but never got into the sheet
+        self.replay_journal()
+        await self.flush_journal()
         self.batch_writer.start()
+        self.bot.jobs.register("refresh_availability", self.refresh_caches, at=time(4, 0))
 
     def cog_unload(self):
+        self.bot.jobs.unregister("refresh_availability")
         self.batch_writer.cancel()
+        self.journal.close()
+
+    async def refresh_caches(self):
+        # Nightly resync of the message index and count matrix with the sheet, after flushing what we hold
+        await self.flush_journal()
+        async with self.write_lock:
+            await self.load_tracked_messages()
+            self.counts.rebuild((await self.sheets.read("availability"))[1:])
+            for entry in self.buffer.pending.values():
+                if entry["message_id"] in self.tracked_messages:
+                    self.counts.apply(entry)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -78,6 +163,10 @@ class AvailabilityScheduler(commands.Cog):
         await self.handle_reaction(payload, "remove")
 
     async def handle_reaction(self, payload, event_type: str):
+        # Reactions on anything but a live availability post are dropped without touching Sheets
+        tracked = self.tracked_messages.get(str(payload.message_id))
+        if not tracked or tracked["channel_id"] != str(payload.channel_id):
+            return
         if payload.user_id == self.bot.user.id:
             return
         guild = self.bot.get_guild(payload.guild_id)
@@ -86,37 +175,24 @@ class AvailabilityScheduler(commands.Cog):
         member = guild.get_member(payload.user_id)
         if not member or member.bot:
             return
-        channel_id = str(payload.channel_id)
         message_id = str(payload.message_id)
         emoji = payload.emoji.name if isinstance(payload.emoji, discord.PartialEmoji) else str(payload.emoji)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         try:
-            current_rows = self.current_sheet.get_all_values()[1:]
-            matched_row = next((r for r in current_rows if r[1] == channel_id and r[2] == message_id), None)
-            if not matched_row:
-                return
-            league = matched_row[0]
-            full_text = matched_row[3]
-            message_text = full_text.split()[0].upper()
-
-            if event_type == "add":
-                self.cache_reaction({
-                    "timestamp": timestamp,
-                    "user_name": member.name,
-                    "user_id": str(member.id),
-                    "emoji": emoji,
-                    "message_id": message_id,
-                    "message_text": message_text,
-                    "league": league
-                })
-            elif event_type == "remove":
-                rows = self.sheet.get_all_values()
-                for i, row in enumerate(rows[1:], start=2):
-                    if len(row) >= 7 and row[2] == str(payload.user_id) and row[3] == emoji and row[4] == message_id:
-                        self.sheet.delete_rows(i)
-                        print(f"🗑️ Removed: {emoji} by {member.name} on {message_text}")
-                        break
+            league = tracked["league"]
+            message_text = tracked["label"].split()[0].upper()
+
+            self.cache_reaction({
+                "event": event_type,
+                "timestamp": timestamp,
+                "user_name": member.name,
+                "user_id": str(member.id),
+                "emoji": emoji,
+                "message_id": message_id,
+                "message_text": message_text,
+                "league": league
+            })
         except Exception as e:
             print(f"❌ Reaction tracking failed: {e}")
 
@@ -127,9 +203,8 @@ class AvailabilityScheduler(commands.Cog):
     async def sendavailability(self, interaction: discord.Interaction, league: app_commands.Choice[str]):
         await interaction.response.defer(ephemeral=True)
         # Check if there is already an active message for this league
-        existing_rows = self.current_sheet.get_all_values()[1:]
-        for row in existing_rows:
-            if row[0] == league.value:
+        for tracked in list(self.tracked_messages.values()):
+            if tracked["league"] == league.value:
                 class ConfirmView(discord.ui.View):
                     def __init__(self):
                         super().__init__(timeout=60)
@@ -160,9 +235,8 @@ class AvailabilityScheduler(commands.Cog):
                 break
 
         # Check if there is already an active message for this league
-        existing_rows = self.current_sheet.get_all_values()[1:]
-        for row in existing_rows:
-            if row[0] == league.value:
+        for tracked in list(self.tracked_messages.values()):
+            if tracked["league"] == league.value:
                 class ConfirmView(discord.ui.View):
                     def __init__(self):
                         super().__init__(timeout=60)
@@ -201,15 +275,32 @@ class AvailabilityScheduler(commands.Cog):
         today = datetime.now().date()
         sunday = today - timedelta(days=(today.weekday() + 1) % 7)
         rows_to_append = []
+        messages = []
+        # Days are posted in order; the 56 reactions then run concurrently across the 7 messages
         for i in range(7):
             day = sunday + timedelta(days=i)
             label = f"{day.strftime('%A').upper()} {day.strftime('%m/%d')} | {league.value}"
             msg = await interaction.channel.send(f"**{label}**")
-            for emoji in emojis:
-                await msg.add_reaction(emoji)
+            messages.append(msg)
             rows_to_append.append([league.value, str(interaction.channel.id), str(msg.id), label])
+            self.track_message(league.value, interaction.channel.id, msg.id, label)
+
+        def react_job(msg):
+            async def react():
+                for emoji in emojis:
+                    await msg.add_reaction(emoji)
+            return react
+
+        async def report(done, total):
+            await interaction.edit_original_response(content=f"⏳ Adding reactions for {league.value}... {done}/{total} days")
+
+        route = f"reactions:{interaction.channel.id}"
+        results = await self.bot.rest.run([(route, react_job(msg)) for msg in messages], progress=report)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"⚠️ Failed to add availability reactions: {result}")
         try:
-            self.current_sheet.append_rows(rows_to_append)
+            await self.sheets.append("currentavailability", rows_to_append)
         except Exception as e:
             print(f"⚠️ Failed to write to currentavailability sheet: {e}")
         await interaction.followup.send(f"✅ Posted availability for {league.value}", ephemeral=True)
@@ -220,34 +311,7 @@ class AvailabilityScheduler(commands.Cog):
     )
     async def deleteavailability(self, interaction: discord.Interaction, league: app_commands.Choice[str]):
         await interaction.response.defer(ephemeral=True)
-        await self._delete_availability_data(str(interaction.channel.id), league.value)
-        channel_id = str(interaction.channel.id)
-        try:
-            rows = self.current_sheet.get_all_values()[1:]
-            to_delete = []
-            msg_ids_to_delete = []
-            for i, row in enumerate(rows):
-                if row[0] == league.value and row[1] == channel_id:
-                    to_delete.append(i + 2)
-                    msg_ids_to_delete.append(row[2])
-            for msg_id in msg_ids_to_delete:
-                try:
-                    msg = await interaction.channel.fetch_message(msg_id)
-                    await msg.delete()
-                    deleted += 1
-                except:
-                    continue
-            avail_rows = self.sheet.get_all_values()
-            avail_delete_rows = [
-                i + 2 for i, row in enumerate(avail_rows[1:])
-                if row[4] in msg_ids_to_delete and row[6] == league.value
-            ]
-            for i in reversed(avail_delete_rows):
-                self.sheet.delete_rows(i)
-            for i in reversed(to_delete):
-                self.current_sheet.delete_rows(i)
-        except Exception as e:
-            print(f"⚠️ Error during deleteavailability: {e}")
+        deleted = await self._delete_availability_data(str(interaction.channel.id), league.value)
         await interaction.followup.send(f"🗑️ Deleted {deleted} messages and cleaned up Google Sheets for {league.value}.", ephemeral=True)
 
 
@@ -259,55 +323,43 @@ class AvailabilityScheduler(commands.Cog):
         ]
     )
     async def checkavailability(self, interaction: discord.Interaction, league: app_commands.Choice[str]):
-        await interaction.response.defer()
-        data = self.sheet.get_all_values()[1:]
-        counts = defaultdict(lambda: defaultdict(int))
-        for row in data:
-            if len(row) < 7:
-                continue
-            _, _, _, emoji, _, message_text, row_league = row
-            if row_league != league.value:
-                continue
-            day = message_text.upper()
-            counts[day][emoji] += 1
-        days = ["SUNDAY", "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY"]
-        times = ["5PM", "6PM", "7PM", "8PM", "9PM", "10PM", "11PM", "12AM"]
+        # Served from the in-memory count matrix, kept current by the reaction stream
+        counts = self.counts.table(league.value)
         lines = [f"**AOS CURRENT {league.value} AVAILABILITY**"]
-        for day in days:
-            line = [f"{time} {counts[day][time]}" for time in times if counts[day][time] > 0]
+        for day in DAYS:
+            line = [f"{time} {counts[day][time]}" for time in TIMES if counts[day][time] > 0]
             if line:
                 lines.append(f"**{day}:** " + " | ".join(line))
-        await interaction.followup.send("\n".join(lines))
+        await interaction.response.send_message("\n".join(lines))
 
     async def _delete_availability_data(self, channel_id, league_value):
         deleted = 0
         try:
-            rows = self.current_sheet.get_all_values()[1:]
+            rows = (await self.sheets.read("currentavailability"))[1:]
             to_delete = []
             msg_ids_to_delete = []
             for i, row in enumerate(rows):
                 if row[0] == league_value and row[1] == channel_id:
                     to_delete.append(i + 2)
                     msg_ids_to_delete.append(row[2])
-            channel = self.bot.get_channel(int(channel_id))
-            for msg_id in msg_ids_to_delete:
-                try:
-                    msg = await channel.fetch_message(int(msg_id))
-                    await msg.delete()
-                    deleted += 1
-                except:
-                    continue
-            avail_rows = self.sheet.get_all_values()
-            avail_delete_rows = [
-                i + 2 for i, row in enumerate(avail_rows[1:])
-                if row[4] in msg_ids_to_delete and row[6] == league_value
-            ]
-            for i in reversed(avail_delete_rows):
-                self.sheet.delete_rows(i)
-            for i in reversed(to_delete):
-                self.current_sheet.delete_rows(i)
+            deleted = await reap_messages(self.bot, [(channel_id, msg_id) for msg_id in msg_ids_to_delete])
+            async with self.write_lock:
+                avail_rows = await self.sheets.read("availability")
+                avail_delete_rows = [
+                    i + 2 for i, row in enumerate(avail_rows[1:])
+                    if len(row) >= 7 and row[4] in msg_ids_to_delete and row[6] == league_value
+                ]
+                await self.sheets.delete_rows("availability", avail_delete_rows)
+                await self.sheets.delete_rows("currentavailability", to_delete)
+                self.untrack_messages(msg_ids_to_delete)
+                for i in avail_delete_rows:
+                    row = avail_rows[i - 1]
+                    self.counts.adjust(row[6], row[5], row[3], -1)
+                for entry in self.buffer.discard(msg_ids_to_delete):
+                    self.counts.apply(entry, sign=-1)
         except Exception as e:
             print(f"⚠️ Error during internal availability deletion: {e}")
+        return deleted
 
 async def setup(bot):
     await bot.add_cog(AvailabilityScheduler(bot))
@@ -0,0 +1,38 @@
+class ReactionBuffer:
+    def __init__(self):
+        # (user_id, emoji, message_id) -> latest net entry still waiting for Sheets
+        self.pending = {}
+
+    @staticmethod
+    def key(entry):
+        return (entry["user_id"], entry["emoji"], entry["message_id"])
+
+    def record(self, entry):
+        key = self.key(entry)
+        queued = self.pending.get(key)
+        if queued and queued.get("event", "add") != entry.get("event", "add"):
+            # An add and a remove for the same reaction cancel out before reaching Sheets
+            del self.pending[key]
+        else:
+            self.pending[key] = entry
+
+    def take(self):
+        snapshot = self.pending
+        self.pending = {}
+        return snapshot
+
+    def restore(self, snapshot):
+        # Put a failed flush back in front of whatever arrived while it was in flight
+        newer = self.pending
+        self.pending = dict(snapshot)
+        for entry in newer.values():
+            self.record(entry)
+
+    def discard(self, message_ids):
+        message_ids = {str(m) for m in message_ids}
+        discarded = [e for e in self.pending.values() if e["message_id"] in message_ids]
+        self.pending = {k: e for k, e in self.pending.items() if e["message_id"] not in message_ids}
+        return discarded
+
+    def __len__(self):
+        return len(self.pending)
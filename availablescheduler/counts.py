@@ -0,0 +1,51 @@
+from array import array
+
+DAYS = ["SUNDAY", "MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY"]
+TIMES = ["5PM", "6PM", "7PM", "8PM", "9PM", "10PM", "11PM", "12AM"]
+
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+TIME_INDEX = {time: i for i, time in enumerate(TIMES)}
+
+class AvailabilityCounts:
+    def __init__(self):
+        # league -> flat 7 x 8 array of reaction counts, row = day, column = time slot
+        self.matrices = {}
+
+    def _slot(self, day, emoji):
+        d = DAY_INDEX.get(str(day).upper())
+        t = TIME_INDEX.get(emoji)
+        if d is None or t is None:
+            return None
+        return d * len(TIMES) + t
+
+    def matrix(self, league):
+        m = self.matrices.get(league)
+        if m is None:
+            m = array("i", [0] * (len(DAYS) * len(TIMES)))
+            self.matrices[league] = m
+        return m
+
+    def adjust(self, league, day, emoji, delta):
+        slot = self._slot(day, emoji)
+        if slot is None:
+            return
+        m = self.matrix(league)
+        m[slot] = max(0, m[slot] + delta)
+
+    def apply(self, entry, sign=1):
+        delta = -1 if entry.get("event", "add") == "remove" else 1
+        self.adjust(entry["league"], entry["message_text"], entry["emoji"], delta * sign)
+
+    def rebuild(self, rows):
+        # rows are availability tab data rows: timestamp, user, user_id, emoji, message_id, message_text, league
+        self.matrices = {}
+        for row in rows:
+            if len(row) >= 7:
+                self.adjust(row[6], row[5], row[3], 1)
+
+    def table(self, league):
+        m = self.matrix(league)
+        return {
+            day: {time: m[d * len(TIMES) + t] for t, time in enumerate(TIMES)}
+            for d, day in enumerate(DAYS)
+        }
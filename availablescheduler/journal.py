@@ -0,0 +1,102 @@
+import os
+import json
+from pathlib import Path
+
+class ReactionJournal:
+    def __init__(self, path="reaction_journal.jsonl", fsync_every=1):
+        self.path = Path(path)
+        self.cursor_path = self.path.with_suffix(".cursor")
+        # fsync after every N appends; 1 = every reaction is durable before we return
+        self.fsync_every = max(1, fsync_every)
+        self.unsynced = 0
+        self.file = self.path.open("ab")
+        self._seal_torn_tail()
+        self.cursor = self._read_cursor()
+
+    def _seal_torn_tail(self):
+        # A crash mid-append can leave half a line; terminate it so the next entry starts clean
+        if self.file.tell() == 0:
+            return
+        with self.path.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                self.file.write(b"\n")
+                self.file.flush()
+
+    def _read_cursor(self):
+        # The cursor is tied to the journal's inode, so a crash mid-compaction can't point it past the new file
+        try:
+            cursor, inode = (int(x) for x in self.cursor_path.read_text().split())
+            stat = self.path.stat()
+        except (FileNotFoundError, ValueError):
+            return 0
+        if inode != stat.st_ino:
+            return 0
+        return min(cursor, stat.st_size)
+
+    def _write_cursor(self, cursor):
+        inode = self.path.stat().st_ino if self.path.exists() else 0
+        tmp_path = self.cursor_path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            f.write(f"{cursor} {inode}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.cursor_path)
+        self.cursor = cursor
+
+    def append(self, entry):
+        self.file.write((json.dumps(entry) + "\n").encode("utf-8"))
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= self.fsync_every:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def position(self):
+        return self.file.tell()
+
+    def pending(self):
+        # Everything after the flush cursor, plus the offset to commit once it reaches Sheets
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        entries = []
+        offset = self.cursor
+        with self.path.open("rb") as f:
+            f.seek(self.cursor)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                offset += len(line)
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping corrupt journal line: {line[:80]!r}")
+        return entries, offset
+
+    def commit(self, offset):
+        self._write_cursor(offset)
+        self.compact()
+
+    def compact(self):
+        # Drop the flushed prefix so the journal only ever holds the unflushed backlog
+        if self.cursor == 0:
+            return
+        with self.path.open("rb") as f:
+            f.seek(self.cursor)
+            tail = f.read()
+        self.file.close()
+        tmp_path = self.path.with_suffix(".compact")
+        with tmp_path.open("wb") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.file = self.path.open("ab")
+        self._write_cursor(0)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
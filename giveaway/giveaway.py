@@ -1,18 +1,17 @@
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
-import json
-import base64
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
+import asyncio
+from datetime import time
+from shared.sheets import appended_start_row
+from shared.prompts import PromptAsset
 
 class GiveawayModal(discord.ui.Modal, title="GIVEAWAY ENTRIES"):
-    def __init__(self, giveaway_sheet):
+    def __init__(self, cog):
         super().__init__()
-        self.giveaway_sheet = giveaway_sheet
+        self.cog = cog
 
         self.top_frag = discord.ui.TextInput(label="Top Frag?", required=True, placeholder="Yes or No")
         self.execution = discord.ui.TextInput(label="Execution:", required=False, placeholder="Enter a number")
@@ -28,23 +27,7 @@ class GiveawayModal(discord.ui.Modal, title="GIVEAWAY ENTRIES"):
             top_frag_value = 1 if top_frag_raw in ["yes", "y"] else 0
             execution_value = int(self.execution.value.strip()) if self.execution.value.strip() else 0
 
-            existing_rows = self.giveaway_sheet.get_all_values()
-            headers = existing_rows[0]
-            user_column_index = headers.index("Discord Username")
-            found = False
-
-            for i, row in enumerate(existing_rows[1:], start=2):
-                if row[user_column_index].strip().lower() == username.lower():
-                    current_frag = int(row[1]) if row[1] else 0
-                    current_exec = int(row[3]) if row[3] else 0
-                    new_row = [username, current_frag + top_frag_value, "", current_exec + execution_value]
-                    self.giveaway_sheet.update(f"A{i}:D{i}", [new_row])
-                    found = True
-                    break
-
-            if not found:
-                new_row = [username, top_frag_value, "", execution_value]
-                self.giveaway_sheet.append_row(new_row)
+            await self.cog.record_entry(username, top_frag_value, execution_value)
 
             target_channel = interaction.client.get_channel(1373018460401176657)
             if target_channel:
@@ -60,89 +43,133 @@ class GiveawayModal(discord.ui.Modal, title="GIVEAWAY ENTRIES"):
             await interaction.response.send_message(f"❌ Submission failed: {e}", ephemeral=True)
 
 class GiveawayButton(discord.ui.View):
-    def __init__(self, giveaway_sheet):
+    def __init__(self, cog):
         super().__init__(timeout=None)
-        self.giveaway_sheet = giveaway_sheet
+        self.cog = cog
 
     @discord.ui.button(label="ENTER GIVEAWAY", style=discord.ButtonStyle.danger, custom_id="giveaway_button")
     async def open_modal(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(GiveawayModal(self.giveaway_sheet))
+        await interaction.response.send_modal(GiveawayModal(self.cog))
 
 class GiveawayForm(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_b64 = os.getenv("GOOGLE_SHEETS_CREDS_B64")
-        creds_json = json.loads(base64.b64decode(creds_b64.encode("utf-8")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.client = gspread.authorize(creds)
-        self.giveaway_sheet = self.client.open("AOS").worksheet("giveaway")
+        self.sheets = bot.sheets
+        # Users whose totals changed since the last flush
+        self.dirty = set()
+        # Users appended to the sheet whose row number the append response didn't give us
+        self.unresolved = set()
+        self.flush_lock = asyncio.Lock()
+        # Held while the leaderboard is reloaded so new entries can't land in the table being replaced
+        self.refresh_lock = asyncio.Lock()
+        self.prompt_image = PromptAsset(os.path.join(os.path.dirname(__file__), "Giveaway Entries.jpg"))
+
+    async def cog_load(self):
+        try:
+            await self.bot.leaderboard.load()
+        except Exception as e:
+            print(f"❌ Failed to load giveaway leaderboard: {e}")
+        self.flush_entries.start()
+        self.bot.jobs.register("refresh_leaderboard", self.refresh_leaderboard, at=time(5, 0))
+
+    async def cog_unload(self):
+        self.bot.jobs.unregister("refresh_leaderboard")
+        self.flush_entries.cancel()
+        await self.flush()
+
+    async def refresh_leaderboard(self):
+        # The Reactions column is kept by hand in the sheet; write our pending counters first so the reload can't drop them
+        async with self.refresh_lock:
+            await self.flush()
+            if self.dirty:
+                print("⚠️ Giveaway flush failed; keeping the current leaderboard until the next refresh")
+                return
+            await self.bot.leaderboard.load(force=True)
+            # The reload read every row number from the sheet
+            self.unresolved = set()
+
+    async def record_entry(self, username, frags, executions):
+        leaderboard = self.bot.leaderboard
+        key = username.lower()
+        # Nothing below awaits, so the update is atomic; it only has to wait out a leaderboard reload
+        async with self.refresh_lock:
+            entry = leaderboard.get(username)
+            current = entry or {"frags": 0, "reactions": 0, "executions": 0}
+            leaderboard.set(username, current["frags"] + frags, current["reactions"], current["executions"] + executions)
+            self.dirty.add(key)
+
+    @tasks.loop(seconds=10)
+    async def flush_entries(self):
+        await self.flush()
+
+    async def resolve_rows(self):
+        # Find where unresolved appends landed from column A; anything not there never made it and is written again
+        names = await self.sheets.column("giveaway", 1)
+        rows = {name.strip().lower(): i for i, name in enumerate(names[1:], start=2)}
+        leaderboard = self.bot.leaderboard
+        for key in self.unresolved:
+            entry = leaderboard.entries.get(key)
+            if entry is None:
+                continue
+            entry["row"] = rows.get(key)
+            if entry["row"] is None:
+                self.dirty.add(key)
+        self.unresolved = set()
+
+    async def flush(self):
+        async with self.flush_lock:
+            if self.unresolved:
+                # Appending these again would give the same user a second row
+                try:
+                    await self.resolve_rows()
+                except Exception as e:
+                    print(f"❌ Failed to resolve giveaway rows: {e}")
+                    return
+            if not self.dirty:
+                return
+            keys, self.dirty = self.dirty, set()
+            leaderboard = self.bot.leaderboard
+            entries = [leaderboard.entries[key] for key in keys if key in leaderboard.entries]
+            existing = [e for e in entries if e["row"]]
+            new = [e for e in entries if not e["row"]]
+            try:
+                # Only the counter cells; the Reactions column is left alone
+                data = []
+                for e in existing:
+                    data.append({"range": f"B{e['row']}", "values": [[e["frags"]]]})
+                    data.append({"range": f"D{e['row']}", "values": [[e["executions"]]]})
+                await self.sheets.update_ranges("giveaway", data)
+
+                if new:
+                    response = await self.sheets.append("giveaway", [[e["name"], e["frags"], "", e["executions"]] for e in new])
+                    start = appended_start_row(response)
+                    if start:
+                        for offset, e in enumerate(new):
+                            e["row"] = start + offset
+                    else:
+                        self.unresolved |= {e["name"].lower() for e in new}
+                print(f"📤 Flushed {len(entries)} giveaway totals")
+            except Exception as e:
+                self.dirty |= keys
+                print(f"❌ Failed to flush giveaway entries: {e}")
 
     @app_commands.command(name="giveawayform", description="Send a giveaway form with entry modal")
     async def giveawayform(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        channel = interaction.channel
-        try:
-            async for msg in channel.history(limit=10):
-                if msg.author.id == interaction.client.user.id and (msg.attachments or msg.components):
-                    await msg.delete()
-        except Exception as e:
-            print(f"⚠️ Cleanup error: {e}")
-        image_path = os.path.join(os.path.dirname(__file__), "Giveaway Entries.jpg")
-        file = discord.File(fp=image_path, filename="Giveaway Entries.jpg")
-        await channel.send(file=file)
-        await channel.send(view=GiveawayButton(self.giveaway_sheet))
+        await self.bot.prompts.post(self.bot, "giveaway", interaction.channel, self.prompt_image, GiveawayButton(self))
         await interaction.followup.send("✅ Giveaway prompt sent.", ephemeral=True)
 
     @app_commands.command(name="leaderboard", description="Display top 10 for Frags, Reactions, and Executions")
     async def leaderboard(self, interaction: discord.Interaction):
-        await interaction.response.defer()
         try:
-            rows = self.giveaway_sheet.get_all_values()[1:]
-            if not rows:
-                await interaction.followup.send("No data found.")
+            if not len(self.bot.leaderboard):
+                await interaction.response.send_message("No data found.")
                 return
-
-            leaderboard_data = []
-            for row in rows:
-                username = row[0]
-                frags = int(row[1]) if row[1].isdigit() else 0
-                reactions = int(row[2]) if row[2].isdigit() else 0
-                executions = int(row[3]) if row[3].isdigit() else 0
-                leaderboard_data.append((username, frags, reactions, executions))
-
-            top_frags = sorted(leaderboard_data, key=lambda x: x[1], reverse=True)[:10]
-            top_reactions = sorted(leaderboard_data, key=lambda x: x[2], reverse=True)[:10]
-            top_executions = sorted(leaderboard_data, key=lambda x: x[3], reverse=True)[:10]
-
-            def format_column(title, data, emoji):
-                lines = [f"**{emoji} {title.upper()}**"]
-                for i, entry in enumerate(data):
-                    user = entry[0]
-                    if i == 0:
-                        lines.append(f"<a:BlackCrown:1353482149096853606> **#{i+1} {user}**")
-                    elif i == 1:
-                        lines.append(f"<a:WhiteCrown:1353482417893277759> **#{i+1} {user}**")
-                    else:
-                        lines.append(f"**#{i+1} {user}**")
-                return "\n\n".join(lines)
-
-            frag_column = format_column("Top Frags", top_frags, "<:CronusZen:1373022628146843671>")
-            react_column = format_column("Top Reactions", top_reactions, "🔁")
-            exec_column = format_column("Top Executions", top_executions, "<a:GhostFaceMurder:1373023142750195862>")
-
-            embed = discord.Embed(title="🏆 **GIVEAWAY LEADERBOARD**", color=discord.Color.red())
-            embed.add_field(name="Top Frags", value=frag_column, inline=True)
-            embed.add_field(name="Top Reactions", value=react_column, inline=True)
-            embed.add_field(name="Top Executions", value=exec_column, inline=True)
-
-            await interaction.followup.send(embed=embed)
-
+            await interaction.response.send_message(embed=self.bot.leaderboard.embed())
         except Exception as e:
-            await interaction.followup.send(f"❌ Leaderboard failed: {e}", ephemeral=True)
+            await interaction.response.send_message(f"❌ Leaderboard failed: {e}", ephemeral=True)
 
 async def setup(bot):
     cog = GiveawayForm(bot)
     await bot.add_cog(cog)
-    bot.add_view(GiveawayButton(cog.giveaway_sheet))
+    bot.add_view(GiveawayButton(cog))
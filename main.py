@@ -7,15 +7,18 @@ import os
 from dotenv import load_dotenv
 import traceback
 import asyncio
-from datetime import datetime
 import json
-import base64
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import hashlib
+from pathlib import Path
+from datetime import time
 
-# Import views from persistent modules
-from Results.results import MatchResultsButton
-from giveaway.giveaway import GiveawayButton
+from shared.sheets import SheetsService
+from shared.rest import RestScheduler
+from shared.matches import MatchIndex
+from shared.leaderboard import Leaderboard
+from shared.lineups import LineupIndex
+from shared.prompts import PromptBoard
+from shared.jobs import JobScheduler
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +31,31 @@ intents.reactions = True
 
 bot = commands.Bot(command_prefix=None, intents=intents)
 
+# One Google Sheets session shared by every cog
+bot.sheets = SheetsService()
+# Concurrent Discord REST work for bulk paths (reactions, deletions, channel creation)
+bot.rest = RestScheduler()
+# In-memory view of the matches tab, loaded by the first cog that needs it
+bot.matches = MatchIndex(bot.sheets)
+# Giveaway top-10 boards shared by /leaderboard and /today
+bot.leaderboard = Leaderboard(bot.sheets)
+# match_id -> posted lineup rows/messages for the lineups and lineuparchive tabs
+bot.lineups = LineupIndex(bot.sheets)
+# Where each *prompt command last posted, and the uploaded image it can reuse
+# Optional PROMPT_ASSET_CHANNEL_ID: a quiet channel to hold the uploaded prompt images
+asset_channel = os.getenv("PROMPT_ASSET_CHANNEL_ID")
+bot.prompts = PromptBoard(asset_channel_id=int(asset_channel) if asset_channel else None)
+bot.add_listener(bot.prompts.on_raw_message_delete)
+# Wall-clock jobs (America/Los_Angeles) that cogs register in cog_load
+bot.jobs = JobScheduler(bot)
+
+async def refresh_match_index():
+    # Picks up manual edits to the matches tab
+    await bot.matches.load(force=True)
+    await bot.lineups.load(force=True)
+
+bot.jobs.register("refresh_match_index", refresh_match_index, at=time(3, 0))
+
 initial_extensions = [
     "Results.results",
     "playerinfo.playerinformation",
@@ -48,38 +76,51 @@ async def load_cogs():
             print(f"❌ Failed to load {ext}: {e}")
             traceback.print_exc()
 
-@bot.event
-async def on_ready():
-    print(f"🤖 Bot is online as {bot.user.name}")
+COMMAND_SYNC_STATE = Path("command_sync_state.json")
+
+def command_tree_hash():
+    # Everything Discord stores about our global commands; if this is unchanged there's nothing to sync
+    try:
+        payload = [cmd.to_dict(bot.tree) for cmd in bot.tree.get_commands()]
+    except TypeError:
+        payload = [cmd.to_dict() for cmd in bot.tree.get_commands()]  # discord.py < 2.4
+    payload.sort(key=lambda cmd: (cmd.get("type", 1), cmd["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+async def sync_commands():
+    # Runs once per process after login, not on every gateway reconnect like on_ready
+    digest = command_tree_hash()
+    try:
+        with COMMAND_SYNC_STATE.open("r") as f:
+            if json.load(f).get("hash") == digest:
+                print("✅ Slash commands unchanged; skipping sync")
+                return
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable {COMMAND_SYNC_STATE}: {e}")
     try:
         synced = await bot.tree.sync(guild=None)
         print(f"✅ Synced {len(synced)} global slash command(s)")
+        tmp_path = COMMAND_SYNC_STATE.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"hash": digest}, f)
+        os.replace(tmp_path, COMMAND_SYNC_STATE)
     except Exception as e:
         print(f"❌ Failed to sync slash commands: {e}")
         traceback.print_exc()
 
-    # ✅ Register persistent views
-    try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_json = json.loads(base64.b64decode(os.getenv("GOOGLE_SHEETS_CREDS_B64")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        client = gspread.authorize(creds)
-
-        match_sheet = client.open("AOS").worksheet("matches")
-        result_sheet = client.open("AOS").worksheet("matchresults")
-        giveaway_sheet = client.open("AOS").worksheet("giveaway")
+bot.setup_hook = sync_commands
 
-        bot.add_view(MatchResultsButton(match_sheet, result_sheet))
-        bot.add_view(GiveawayButton(giveaway_sheet))
-
-        print("✅ Registered persistent views")
-    except Exception as e:
-        print(f"❌ Failed to register persistent views: {e}")
-        traceback.print_exc()
+@bot.event
+async def on_ready():
+    # Persistent views are registered by each cog's setup(); nothing here needs to repeat on reconnect
+    print(f"🤖 Bot is online as {bot.user.name}")
 
 # 🚀 Start bot
 async def main():
     await load_cogs()
+    bot.jobs.start()
     await bot.start(os.getenv("TOKEN"))
 
 asyncio.run(main())
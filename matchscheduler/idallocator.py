@@ -0,0 +1,48 @@
+import os
+import json
+import asyncio
+from pathlib import Path
+
+class MatchIdAllocator:
+    def __init__(self, sheets, state_path="match_id_state.json"):
+        self.sheets = sheets
+        self.state_path = Path(state_path)
+        self.lock = asyncio.Lock()
+        self.last_id = None
+
+    async def seed(self):
+        async with self.lock:
+            await self._seed()
+
+    async def _seed(self):
+        if self.last_id is not None:
+            return
+        try:
+            with self.state_path.open("r") as f:
+                self.last_id = int(json.load(f)["last_id"])
+                print(f"🔢 Match IDs resume after {self.last_id}")
+                return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable {self.state_path}: {e}")
+        # First run (or lost state): one full scan of matcharchive column 9, then never again
+        archive_ids = (await self.sheets.column("matcharchive", 9))[1:]
+        self.last_id = max([int(i) for i in archive_ids if str(i).isdigit()] or [0])
+        self._save()
+        print(f"🔢 Seeded match IDs from matcharchive at {self.last_id}")
+
+    def _save(self):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"last_id": self.last_id}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    async def allocate(self):
+        async with self.lock:
+            await self._seed()
+            self.last_id += 1
+            self._save()
+            return self.last_id
@@ -2,22 +2,19 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-import json
-import base64
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
+from matchscheduler.idallocator import MatchIdAllocator
+from shared.sheets import appended_start_row
+from shared.reaper import reap_messages
 
 class MatchScheduleModal(discord.ui.Modal, title="📆 Schedule a Match"):
-    def __init__(self, league, match_type, players, sheet, archive_sheet):
+    def __init__(self, league, match_type, players, sheets, id_allocator):
         super().__init__(timeout=None)
         self.league = league
         self.match_type = match_type
         self.players = players
-        self.sheet = sheet
-        self.archive_sheet = archive_sheet
+        self.sheets = sheets
+        self.id_allocator = id_allocator
 
         self.date = discord.ui.TextInput(label="Date", placeholder="MM/DD", required=True)
         self.time = discord.ui.TextInput(label="Time", placeholder="e.g., 7PM, 8PM", required=True)
@@ -44,9 +41,7 @@ class MatchScheduleModal(discord.ui.Modal, title="📆 Schedule a Match"):
 
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            archive_ids = self.archive_sheet.col_values(9)[1:]
-            last_id = max([int(i) for i in archive_ids if i.isdigit()] or [0])
-            match_id = last_id + 1
+            match_id = await self.id_allocator.allocate()
 
             message = (
                 f"# {emoji_str} {self.date.value} | {self.time.value} | "
@@ -70,8 +65,14 @@ class MatchScheduleModal(discord.ui.Modal, title="📆 Schedule a Match"):
                 str(sent_msg.channel.id)
             ]
 
-            self.sheet.append_row(new_row)
-            self.archive_sheet.append_row(new_row)
+            # Row positions in the index must follow the sheet, so appends and removals take turns
+            matches = interaction.client.matches
+            async with matches.lock:
+                response = await self.sheets.append("matches", [new_row])
+                in_step = matches.add(new_row, appended_start_row(response))
+            if not in_step:
+                await matches.load(force=True)
+            await self.sheets.append("matcharchive", [new_row])
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
@@ -79,15 +80,18 @@ class MatchScheduleModal(discord.ui.Modal, title="📆 Schedule a Match"):
 class MatchScheduler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_b64 = os.getenv("GOOGLE_SHEETS_CREDS_B64")
-        creds_json = json.loads(base64.b64decode(creds_b64.encode("utf-8")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.client = gspread.authorize(creds)
-        self.sheet = self.client.open("AOS").worksheet("matches")
-        self.archive_sheet = self.client.open("AOS").worksheet("matcharchive")
-        self.lineup_sheet = self.client.open("AOS").worksheet("lineups")
+        self.sheets = bot.sheets
+        self.id_allocator = MatchIdAllocator(self.sheets)
+
+    async def cog_load(self):
+        try:
+            await self.id_allocator.seed()
+        except Exception as e:
+            print(f"❌ Failed to seed match IDs: {e}")
+        try:
+            await self.bot.lineups.load()
+        except Exception as e:
+            print(f"❌ Failed to load lineups: {e}")
 
     @app_commands.command(name="schedulematch", description="Schedule a match and notify the team.")
     @app_commands.choices(
@@ -111,34 +115,16 @@ class MatchScheduler(commands.Cog):
         ]
     )
     async def schedulematch(self, interaction: discord.Interaction, league: app_commands.Choice[str], match_type: app_commands.Choice[str], players: app_commands.Choice[str]):
-        await interaction.response.send_modal(MatchScheduleModal(league.value, match_type.value, players.value, self.sheet, self.archive_sheet))
+        await interaction.response.send_modal(MatchScheduleModal(league.value, match_type.value, players.value, self.sheets, self.id_allocator))
 
     @app_commands.command(name="deletelineup", description="Delete a lineup by Match ID")
     async def deletelineup(self, interaction: discord.Interaction, match_id: int):
         await interaction.response.defer(ephemeral=True)
         try:
-            values = self.lineup_sheet.get_all_values()
-            headers = values[0]
-            id_index = headers.index("Match ID")
-            msg_index = headers.index("message id")
-            chan_index = headers.index("channel id")
-            target_row = None
-            for idx, row in enumerate(values[1:], start=2):
-                if row[id_index] == str(match_id):
-                    target_row = idx
-                    msg_id = int(row[msg_index])
-                    chan_id = int(row[chan_index])
-                    break
-
-            if target_row:
-                self.lineup_sheet.delete_rows(target_row)
-                channel = self.bot.get_channel(chan_id)
-                if channel:
-                    try:
-                        msg = await channel.fetch_message(msg_id)
-                        await msg.delete()
-                    except:
-                        pass
+            removed = await self.bot.lineups.delete(match_id)
+
+            if removed:
+                await reap_messages(self.bot, [(chan_id, msg_id) for _, msg_id, chan_id in removed])
                 await interaction.followup.send(f"✅ Lineup for Match ID {match_id} deleted.", ephemeral=True)
             else:
                 await interaction.followup.send(f"❌ No lineup found for Match ID {match_id}.", ephemeral=True)
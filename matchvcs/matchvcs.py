@@ -1,42 +1,28 @@
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import os
-import json
-import base64
-import gspread
-from datetime import datetime
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
+from datetime import datetime, time
 
 class MatchVoiceChannels(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        load_dotenv()
-
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_json = json.loads(base64.b64decode(os.getenv("GOOGLE_SHEETS_CREDS_B64")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.client = gspread.authorize(creds)
-        self.matches_sheet = self.client.open("AOS").worksheet("matches")
-        self.voicechats_sheet = self.client.open("AOS").worksheet("voicechats")
+        self.sheets = bot.sheets
 
         self.category_id = 1360145897857482792
-        self.midnight_task.start()
-
-    def get_today_matches(self):
-        today = datetime.now()
-        today_strs = [
-            today.strftime("%-m/%-d"),
-            today.strftime("%-m/%d"),
-            today.strftime("%m/%d"),
-            today.strftime("%-m/%-d/%Y")
-        ]
-        rows = self.matches_sheet.get_all_values()[1:]
-        return [row for row in rows if row[2].strip() in today_strs]
-
-    def log_match_data(self, matches):
+
+    async def cog_load(self):
+        self.bot.jobs.register("create_match_vcs", self.scheduled_voice_channels, at=time(0, 0))
+
+    async def cog_unload(self):
+        self.bot.jobs.unregister("create_match_vcs")
+
+    async def get_today_matches(self):
+        await self.bot.matches.load()
+        return self.bot.matches.on(datetime.now(self.bot.jobs.tz))
+
+    def match_log_rows(self, matches):
+        rows = []
         for row in matches:
             if len(row) >= 9:
                 match_id = row[8].strip()
@@ -50,14 +36,16 @@ class MatchVoiceChannels(commands.Cog):
                 name = f"{enemy_team} {league} {date} {time} {players}".strip()
                 if name.lower() == "channel name":
                     continue
-                self.voicechats_sheet.append_row([name, "", match_id], value_input_option="RAW")
+                rows.append([name, "", match_id])
+        return rows
 
-    def clean_voicechats_log(self):
-        rows = self.voicechats_sheet.get_all_values()
+    async def clean_voicechats_log(self, matches=()):
+        # Read once, merge today's matches and dedupe in memory, then write the table back in one ranged update
+        rows = await self.sheets.read("voicechats")
         seen_ids = set()
         to_keep = []
 
-        for row in rows:
+        for row in rows + self.match_log_rows(matches):
             if len(row) < 3:
                 continue
             name = row[0].strip()
@@ -72,11 +60,13 @@ class MatchVoiceChannels(commands.Cog):
             seen_ids.add(match_id)
             to_keep.append([name, "", match_id])
 
-        self.voicechats_sheet.clear()
-        for row in to_keep:
-            self.voicechats_sheet.append_row(row, value_input_option="RAW")
+        if to_keep:
+            await self.sheets.update("voicechats", f"A1:C{len(to_keep)}", to_keep, value_input_option="RAW")
+        if len(rows) > len(to_keep):
+            await self.sheets.clear_ranges("voicechats", [f"A{len(to_keep) + 1}:C{len(rows)}"])
 
-        return {row[2]: row[0] for row in to_keep}
+        # match_id -> (sheet row, channel name)
+        return {row[2]: (i, row[0]) for i, row in enumerate(to_keep, start=1)}
 
     async def create_voice_channels(self, guild, match_data):
         category = guild.get_channel(self.category_id)
@@ -84,57 +74,75 @@ class MatchVoiceChannels(commands.Cog):
             print(f"❌ Category ID {self.category_id} not found in guild.")
             return
 
-        for match_id, channel_name in match_data.items():
-            try:
-                vc = await guild.create_voice_channel(channel_name, category=category)
-                all_rows = self.voicechats_sheet.get_all_values()
-                for i, row in enumerate(all_rows):
-                    if len(row) >= 3 and row[2] == match_id:
-                        self.voicechats_sheet.update_cell(i + 1, 2, str(vc.id))
-                        break
-                print(f"✅ Created voice channel: {channel_name}")
-            except Exception as e:
-                print(f"❌ Failed to create voice channel '{channel_name}': {e}")
+        def create_job(channel_name):
+            async def create():
+                return await guild.create_voice_channel(channel_name, category=category)
+            return create
+
+        entries = list(match_data.values())
+        route = f"channels:{guild.id}"
+        results = await self.bot.rest.run([(route, create_job(name)) for _, name in entries])
+
+        # Every new channel ID goes back to the sheet in one batched write
+        id_cells = []
+        for (row, channel_name), result in zip(entries, results):
+            if isinstance(result, Exception):
+                print(f"❌ Failed to create voice channel '{channel_name}': {result}")
+                continue
+            id_cells.append({"range": f"B{row}", "values": [[str(result.id)]]})
+            print(f"✅ Created voice channel: {channel_name}")
+        try:
+            await self.sheets.update_ranges("voicechats", id_cells, value_input_option="RAW")
+        except Exception as e:
+            print(f"❌ Failed to record voice channel IDs: {e}")
 
     async def create_today_voice_channels(self, guild):
-        matches = self.get_today_matches()
-        self.log_match_data(matches)
-        filtered_matches = self.clean_voicechats_log()
+        matches = await self.get_today_matches()
+        filtered_matches = await self.clean_voicechats_log(matches)
         await self.create_voice_channels(guild, filtered_matches)
 
     @app_commands.command(name="creatematchvcs", description="Manually create today's match voice chats.")
     async def creatematchvcs(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
         await self.create_today_voice_channels(interaction.guild)
-        await interaction.response.send_message("✅ Match voice channels created for today.", ephemeral=True)
+        await interaction.followup.send("✅ Match voice channels created for today.", ephemeral=True)
 
     @app_commands.command(name="clearmatchvcs", description="Clear all match voice channels listed in the voicechats tab.")
     async def clearmatchvcs(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
         guild = interaction.guild
-        deleted_channels = []
 
-        voice_rows = self.voicechats_sheet.get_all_values()
+        voice_rows = await self.sheets.read("voicechats")
+        channels = []
         for row in voice_rows:
             try:
                 vc = guild.get_channel(int(row[1]))
                 if vc:
-                    await vc.delete()
-                    deleted_channels.append(vc.name)
+                    channels.append(vc)
             except Exception as e:
-                print(f"⚠️ Could not delete voice channel {row[1]}: {e}")
-
-        self.voicechats_sheet.clear()
-        await interaction.response.send_message(f"🧹 Cleared {len(deleted_channels)} match voice channels.", ephemeral=True)
-
-    @tasks.loop(minutes=1)
-    async def midnight_task(self):
-        now = datetime.utcnow()
-        if now.hour == 7 and now.minute == 0:  # 12AM PST
-            if self.bot.guilds:
-                guild = self.bot.guilds[0]
-                await self.create_today_voice_channels(guild)
-                print("🌙 Auto-created voice channels at midnight PST.")
+                print(f"⚠️ Could not delete voice channel {row[1] if len(row) > 1 else row}: {e}")
+
+        route = f"channels:{guild.id}"
+        results = await self.bot.rest.run([(route, vc.delete) for vc in channels])
+        deleted_channels = []
+        for vc, result in zip(channels, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Could not delete voice channel {vc.id}: {result}")
             else:
-                print("❌ No guilds found for midnight task.")
+                deleted_channels.append(vc.name)
+
+        await self.sheets.clear("voicechats")
+        await interaction.followup.send(f"🧹 Cleared {len(deleted_channels)} match voice channels.", ephemeral=True)
+
+    async def scheduled_voice_channels(self):
+        # Midnight Pacific, every guild that has the match VC category
+        guilds = [g for g in self.bot.guilds if g.get_channel(self.category_id)]
+        if not guilds:
+            print("❌ No guilds found for midnight task.")
+            return
+        for guild in guilds:
+            await self.create_today_voice_channels(guild)
+            print(f"🌙 Auto-created voice channels at midnight PST for {guild.name}.")
 
 async def setup(bot):
     await bot.add_cog(MatchVoiceChannels(bot))
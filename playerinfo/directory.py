@@ -0,0 +1,128 @@
+from shared.text import chunk_lines
+
+# playerinformation row: timestamp, username, user id, activision id, platform, stream
+USER_ID_COL = 2
+
+def render_player(row):
+    return f"**<@{row[USER_ID_COL]}> | {row[3].upper()} | {row[4].upper()} | {row[5].upper()}**"
+
+class PlayerDirectory:
+    def __init__(self):
+        # rows[i] mirrors sheet row i + 2; by_id maps Discord user ID -> position in rows
+        self.rows = []
+        self.by_id = {}
+        self.roster_pages = None
+
+    def load(self, rows):
+        self.rows = [list(row) + [""] * (6 - len(row)) for row in rows]
+        self._reindex()
+
+    def _reindex(self):
+        self.by_id = {}
+        for i, row in enumerate(self.rows):
+            if row and row[USER_ID_COL]:
+                self.by_id[row[USER_ID_COL]] = i
+        self.roster_pages = None
+
+    def get(self, user_id):
+        i = self.by_id.get(str(user_id))
+        return self.rows[i] if i is not None else None
+
+    def row_number(self, user_id):
+        i = self.by_id.get(str(user_id))
+        return i + 2 if i is not None else None
+
+    def upsert(self, values, row_number=None):
+        values = [str(v) for v in values] + [""] * (6 - len(values))
+        i = self.by_id.get(values[USER_ID_COL])
+        if i is not None:
+            self.rows[i] = values
+        else:
+            if row_number is not None:
+                # Rows someone added by hand, contents unknown (None) until the next load
+                while len(self.rows) < row_number - 2:
+                    self.rows.append(None)
+            self.rows.append(values)
+            self.by_id[values[USER_ID_COL]] = len(self.rows) - 1
+        self.roster_pages = None
+
+    def stale_rows(self, valid_ids):
+        # Every known row whose user ID isn't in valid_ids, duplicates and blank IDs included
+        return [i + 2 for i, row in enumerate(self.rows) if row is not None and row[USER_ID_COL] not in valid_ids]
+
+    def remove_rows(self, row_numbers):
+        drop = {n - 2 for n in row_numbers}
+        self.rows = [row for i, row in enumerate(self.rows) if i not in drop]
+        self._reindex()
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def roster(self):
+        # Pre-rendered, message-sized pages for the @everyone listing; rebuilt only after a change
+        if self.roster_pages is None:
+            lines = [render_player(row) for row in self.rows if row and row[USER_ID_COL]]
+            self.roster_pages = chunk_lines(lines, header="# AOS ACTIVE PLAYERS")
+        return self.roster_pages
+
+USERS_HEADER = ["Username", "Server Name", "User ID"]
+
+def member_row(member):
+    return [str(member), member.display_name, str(member.id)]
+
+class UsersTab:
+    def __init__(self):
+        # Mirror of the Users tab below its header: rows[i] is sheet row i + 2
+        self.rows = []
+        self.by_id = {}
+        self.has_header = False
+
+    def load(self, values):
+        self.has_header = bool(values)
+        self.rows = [list(row) + [""] * (3 - len(row)) for row in values[1:]]
+        self._reindex()
+
+    def _reindex(self):
+        self.by_id = {row[2]: i for i, row in enumerate(self.rows) if row[2]}
+
+    def row_number(self, user_id):
+        i = self.by_id.get(str(user_id))
+        return i + 2 if i is not None else None
+
+    def diff(self, members):
+        # (row_number, values) rewrites, row numbers to delete and rows to append; row numbers are pre-delete
+        wanted = {str(m.id): member_row(m) for m in members}
+        updates, deletes = [], []
+        for i, row in enumerate(self.rows):
+            new = wanted.pop(row[2], None) if row[2] else None
+            if new is None:
+                deletes.append(i + 2)
+            elif new != row[:3]:
+                updates.append((i + 2, new))
+        appends = list(wanted.values())
+        if not self.has_header:
+            appends.insert(0, USERS_HEADER)
+        return updates, deletes, appends
+
+    def changes_for(self, member):
+        # Same shape as diff(), limited to one member being added or renamed
+        values = member_row(member)
+        row_number = self.row_number(member.id)
+        if row_number:
+            changed = self.rows[row_number - 2][:3] != values
+            return ([(row_number, values)] if changed else []), [], []
+        return [], [], ([values] if self.has_header else [USERS_HEADER, values])
+
+    def apply(self, updates, deletes, appends):
+        for row_number, values in updates:
+            self.rows[row_number - 2] = values
+        drop = {n - 2 for n in deletes}
+        self.rows = [row for i, row in enumerate(self.rows) if i not in drop]
+        if not self.has_header and appends:
+            appends = appends[1:]
+            self.has_header = True
+        self.rows.extend(appends)
+        self._reindex()
+
+    def __len__(self):
+        return len(self.by_id)
@@ -3,17 +3,17 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import os
-import json
-import base64
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
+import asyncio
+from shared.sheets import appended_start_row, update_row_request, append_rows_request, delete_rows_requests
+from shared.prompts import PromptAsset
+from playerinfo.directory import PlayerDirectory, UsersTab, USERS_HEADER, render_player
 
 class PlayerInfoModal(discord.ui.Modal, title="AOS PLAYER INFORMATION"):
-    def __init__(self, sheet):
+    def __init__(self, cog):
         super().__init__()
-        self.sheet = sheet
+        self.cog = cog
+        self.sheets = cog.sheets
 
         self.activision = discord.ui.TextInput(label="Activision ID", placeholder="e.g., Username#123456", required=True)
         self.platform = discord.ui.TextInput(label="Platform", placeholder="PC / Xbox / Playstation", required=True)
@@ -47,17 +47,15 @@ class PlayerInfoModal(discord.ui.Modal, title="AOS PLAYER INFORMATION"):
             await channel.send(response)
 
         try:
-            rows = self.sheet.get_all_values()
-            updated = False
-
-            for idx, row in enumerate(rows[1:], start=2):
-                if len(row) >= 3 and row[2] == str(user.id):
-                    self.sheet.update(f"A{idx}:F{idx}", [values])
-                    updated = True
-                    break
-
-            if not updated:
-                self.sheet.append_row(values)
+            directory = self.cog.directory
+            async with self.cog.sync_lock:
+                _, idx = await self.cog.checked_rows(user.id)
+                if idx:
+                    await self.sheets.update("playerinformation", f"A{idx}:F{idx}", [values])
+                    directory.upsert(values)
+                else:
+                    response = await self.sheets.append("playerinformation", [values])
+                    directory.upsert(values, appended_start_row(response))
 
         except Exception as e:
             print(f"⚠️ Failed to log/update Google Sheet: {e}")
@@ -65,9 +63,9 @@ class PlayerInfoModal(discord.ui.Modal, title="AOS PLAYER INFORMATION"):
         await interaction.response.send_message("✅ Your player info was submitted!", ephemeral=True)
 
 class PlayerInfoButton(discord.ui.View):
-    def __init__(self, sheet):
+    def __init__(self, cog):
         super().__init__(timeout=None)
-        self.sheet = sheet
+        self.cog = cog
 
     @discord.ui.button(
         label="AOS PLAYER INFORMATION",
@@ -75,67 +73,119 @@ class PlayerInfoButton(discord.ui.View):
         custom_id="player_info_button"
     )
     async def submit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(PlayerInfoModal(self.sheet))
+        await interaction.response.send_modal(PlayerInfoModal(self.cog))
 
 class PlayerInformation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.sheets = bot.sheets
+        # Discord user ID -> playerinformation row, loaded once and kept current by our own writes
+        self.directory = PlayerDirectory()
+        self.users = UsersTab()
+        # Row numbers shift on delete, so structural writes to either tab go one at a time
+        self.sync_lock = asyncio.Lock()
+        self.prompt_image = PromptAsset(os.path.join(os.path.dirname(__file__), "Playerinfo Report.jpg"))
+
+    async def cog_load(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            print(f"❌ Failed to load player directory: {e}")
+
+    async def reload(self):
+        # Both tabs in one values:batchGet
+        players, users = await self.sheets.batch_get(["'playerinformation'", "'Users'"])
+        self.directory.load(players[1:])
+        self.users.load(users)
+        print(f"🪪 Loaded {len(self.directory)} player records and {len(self.users)} users")
+
+    async def checked_rows(self, user_id):
+        # Cached (Users row, playerinformation row) for user_id, confirmed against column C of the live sheet;
+        # a hand edit that shifted rows triggers a reload instead of a write to someone else's row
+        user_row = self.users.row_number(user_id)
+        player_row = self.directory.row_number(user_id)
+        ranges = []
+        if user_row:
+            ranges.append(f"'Users'!C{user_row}")
+        if player_row:
+            ranges.append(f"'playerinformation'!C{player_row}")
+        if not ranges:
+            return user_row, player_row
+        cells = await self.sheets.batch_get(ranges)
+        if all(values and values[0] and values[0][0] == str(user_id) for values in cells):
+            return user_row, player_row
+        print(f"⚠️ Player directory out of step with the sheet at user {user_id}; reloading")
+        await self.reload()
+        return self.users.row_number(user_id), self.directory.row_number(user_id)
+
+    async def remove_member(self, user_id):
+        async with self.sync_lock:
+            user_row, player_row = await self.checked_rows(user_id)
+            requests = []
+            if user_row:
+                requests += delete_rows_requests(await self.sheets.sheet_id("Users"), [user_row])
+            if player_row:
+                requests += delete_rows_requests(await self.sheets.sheet_id("playerinformation"), [player_row])
+            if not requests:
+                return
+            await self.sheets.batch_update(requests)
+            if user_row:
+                self.users.apply([], [user_row], [])
+            if player_row:
+                self.directory.remove_rows([player_row])
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        if member.bot:
+            return
+        try:
+            async with self.sync_lock:
+                await self.checked_rows(member.id)
+                updates, deletes, appends = self.users.changes_for(member)
+                if not (updates or appends):
+                    return
+                sheet_id = await self.sheets.sheet_id("Users")
+                requests = [update_row_request(sheet_id, row, values) for row, values in updates]
+                if appends:
+                    requests.append(append_rows_request(sheet_id, appends))
+                await self.sheets.batch_update(requests)
+                self.users.apply(updates, deletes, appends)
+        except Exception as e:
+            print(f"⚠️ Failed to add {member} to Users: {e}")
 
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = base64.b64decode(os.getenv("GOOGLE_SHEETS_CREDS_B64")).decode("utf-8")
-        creds_json = json.loads(creds)
-        self.client = gspread.authorize(ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope))
-        self.sheet = self.client.open("AOS").worksheet("playerinformation")
-        self.users_sheet = self.client.open("AOS").worksheet("Users")
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        if member.bot:
+            return
+        try:
+            await self.remove_member(member.id)
+        except Exception as e:
+            print(f"⚠️ Failed to remove {member} from Users/playerinformation: {e}")
 
     @app_commands.command(name="playerinfoprompt", description="Post the player info submission image + button.")
     async def playerinfoprompt(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-
-        channel = interaction.channel
-
-        try:
-            async for msg in channel.history(limit=10):
-                if msg.author.id == interaction.client.user.id and (msg.attachments or msg.components):
-                    await msg.delete()
-        except Exception as e:
-            print(f"⚠️ Failed to clean previous prompt: {e}")
-
-        image_path = os.path.join(os.path.dirname(__file__), "Playerinfo Report.jpg")
-        file = discord.File(fp=image_path, filename="Playerinfo Report.jpg")
-        await channel.send(file=file)
-        await channel.send(view=PlayerInfoButton(self.sheet))
+        await self.bot.prompts.post(self.bot, "playerinfo", interaction.channel, self.prompt_image, PlayerInfoButton(self))
         await interaction.followup.send("✅ Prompt sent.", ephemeral=True)
 
     @app_commands.command(name="userinformation", description="View player info or show all.")
     @app_commands.describe(user="Select a user or choose yourself. Use @everyone to show all.")
     async def userinformation(self, interaction: discord.Interaction, user: discord.User = None):
-        all_rows = self.sheet.get_all_values()
-        rows = all_rows[1:]
-
         if user is None or user == interaction.guild.default_role:
-            if not rows:
+            if not len(self.directory):
                 await interaction.response.send_message("⚠️ No entries found.", ephemeral=True)
                 return
 
-            lines = []
-            for row in rows:
-                if len(row) >= 6:
-                    uid = row[2]
-                    line = f"**<@{uid}> | {row[3].upper()} | {row[4].upper()} | {row[5].upper()}**"
-                    lines.append(line)
-
-            header = "# AOS ACTIVE PLAYERS"
-            result = f"{header}\n" + "\n".join(lines)
-            await interaction.response.send_message(result, ephemeral=False)
+            pages = self.directory.roster()
+            await interaction.response.send_message(pages[0], ephemeral=False)
+            for page in pages[1:]:
+                await interaction.followup.send(page)
             return
 
-        for row in rows:
-            if len(row) >= 4 and row[2] == str(user.id):
-                msg = f"**<@{user.id}> | {row[3].upper()} | {row[4].upper()} | {row[5].upper()}**"
-                await interaction.response.send_message(msg, ephemeral=False)
-                return
+        row = self.directory.get(user.id)
+        if row:
+            await interaction.response.send_message(render_player(row), ephemeral=False)
+            return
 
         await interaction.response.send_message("⚠️ No player info found for that user.", ephemeral=False)
 
@@ -148,29 +198,37 @@ class PlayerInformation(commands.Cog):
             return
 
         members = [m for m in guild.members if not m.bot]
-        user_data = [[str(m), m.display_name, str(m.id)] for m in members]
-
-        self.users_sheet.clear()
-        self.users_sheet.append_row(["Username", "Server Name", "User ID"])
-        self.users_sheet.append_rows(user_data)
-
         valid_ids = set(str(m.id) for m in members)
-        all_rows = self.sheet.get_all_values()
-        rows = all_rows[1:]
-        deleted = 0
-
-        for i in reversed(range(len(rows))):
-            row = rows[i]
-            if len(row) >= 3 and row[2] not in valid_ids:
-                self.sheet.delete_rows(i + 2)
-                deleted += 1
 
+        async with self.sync_lock:
+            # Fresh read of both tabs, then send only what changed, both tabs in one batchUpdate
+            await self.reload()
+            updates, deletes, appends = self.users.diff(members)
+            to_delete = self.directory.stale_rows(valid_ids)
+
+            requests = []
+            if updates or deletes or appends:
+                users_id = await self.sheets.sheet_id("Users")
+                requests += [update_row_request(users_id, row, values) for row, values in updates]
+                requests += delete_rows_requests(users_id, deletes)
+                if appends:
+                    requests.append(append_rows_request(users_id, appends))
+            if to_delete:
+                requests += delete_rows_requests(await self.sheets.sheet_id("playerinformation"), to_delete)
+
+            await self.sheets.batch_update(requests)
+            self.users.apply(updates, deletes, appends)
+            self.directory.remove_rows(to_delete)
+
+        added = len(appends) - (1 if appends and appends[0] == USERS_HEADER else 0)
         await interaction.followup.send(
-            f"✅ Synced {len(user_data)} users to 'Users' sheet.\n🗑️ Removed {deleted} outdated entries from playerinformation.",
+            f"✅ Synced {len(members)} users to 'Users' sheet "
+            f"(+{added} / ~{len(updates)} / -{len(deletes)}).\n"
+            f"🗑️ Removed {len(to_delete)} outdated entries from playerinformation.",
             ephemeral=True
         )
 
 async def setup(bot):
     cog = PlayerInformation(bot)
     await bot.add_cog(cog)
-    bot.add_view(PlayerInfoButton(cog.sheet))
+    bot.add_view(PlayerInfoButton(cog))
@@ -2,13 +2,9 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-import json
-import base64
-import gspread
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
+import asyncio
 from datetime import datetime
+from shared.reaper import reap_messages
 
 class ShooterSelect(discord.ui.UserSelect):
     def __init__(self):
@@ -29,12 +25,11 @@ class SubSelect(discord.ui.UserSelect):
         await interaction.response.defer()
 
 class SubmitCompactButton(discord.ui.Button):
-    def __init__(self, match_row, emoji_map, sheet, archive_sheet, shooter_dropdown, sub_dropdown, match_id):
+    def __init__(self, match_row, emoji_map, lineups, shooter_dropdown, sub_dropdown, match_id):
         super().__init__(label="✅ Submit Lineup", style=discord.ButtonStyle.success)
         self.match_row = match_row
         self.emoji_map = emoji_map
-        self.sheet = sheet
-        self.archive_sheet = archive_sheet
+        self.lineups = lineups
         self.shooter_dropdown = shooter_dropdown
         self.sub_dropdown = sub_dropdown
         self.match_id = match_id
@@ -71,21 +66,15 @@ class SubmitCompactButton(discord.ui.Button):
             f"{d9_line}"
         )
 
-        # Delete previous message for this match_id if it exists in archive sheet
-        archive_rows = self.archive_sheet.get_all_values()
-        for row in archive_rows[1:]:
-            if row[1] == str(self.match_id):
-                try:
-                    msg_id = int(row[-2])
-                    ch_id = int(row[-1])
-                    channel = interaction.client.get_channel(ch_id)
-                    if channel:
-                        msg = await channel.fetch_message(msg_id)
-                        await msg.delete()
-                except:
-                    pass
+        # Previous post for this match_id, looked up before the archive index moves on to the new one
+        previous = self.lineups.previous(self.match_id)
 
         sent_msg = await interaction.channel.send(message)
+        await interaction.response.send_message("✅ Lineup submitted and posted!", ephemeral=True)
+
+        if previous:
+            _, msg_id, ch_id = previous
+            await reap_messages(interaction.client, [(ch_id, msg_id)])
 
         timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
         shooter_names = [user.display_name for user in shooters] + [""] * (6 - len(shooters))
@@ -94,44 +83,36 @@ class SubmitCompactButton(discord.ui.Button):
         row = [timestamp, self.match_id, enemy_team, league] + shooter_names + sub_names
         row += [str(sent_msg.id), str(interaction.channel.id)]
 
-        # Delete any existing row in "lineups" tab
-        all_rows = self.sheet.get_all_values()
-        to_delete = [i for i, row in enumerate(all_rows[1:], start=2) if row[1] == str(self.match_id)]
-        for idx in reversed(to_delete):
-            self.sheet.delete_rows(idx)
-        self.sheet.append_row(row)
-        self.archive_sheet.append_row(row)
-
-        await interaction.response.send_message("✅ Lineup submitted and posted!", ephemeral=True)
+        # Replace the live row and archive the post in one write
+        try:
+            await self.lineups.replace(self.match_id, row)
+        except Exception as e:
+            print(f"⚠️ Failed to record lineup for match {self.match_id}: {e}")
 
 class CompactLineupView(discord.ui.View):
-    def __init__(self, match_row, emoji_map, sheet, archive_sheet, match_id):
+    def __init__(self, match_row, emoji_map, lineups, match_id):
         super().__init__(timeout=300)
         shooter_dd = ShooterSelect()
         sub_dd = SubSelect()
         self.add_item(shooter_dd)
         self.add_item(sub_dd)
-        self.add_item(SubmitCompactButton(match_row, emoji_map, sheet, archive_sheet, shooter_dd, sub_dd, match_id))
+        self.add_item(SubmitCompactButton(match_row, emoji_map, lineups, shooter_dd, sub_dd, match_id))
 
 class SetLineup(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        load_dotenv()
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds_b64 = os.getenv("GOOGLE_SHEETS_CREDS_B64")
-        creds_json = json.loads(base64.b64decode(creds_b64.encode("utf-8")).decode("utf-8"))
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        self.client = gspread.authorize(creds)
-        self.match_sheet = self.client.open("AOS").worksheet("matches")
-        self.lineup_sheet = self.client.open("AOS").worksheet("lineups")
-        self.archive_sheet = self.client.open("AOS").worksheet("lineuparchive")
+        self.sheets = bot.sheets
+
+    async def cog_load(self):
+        try:
+            await asyncio.gather(self.bot.matches.load(), self.bot.lineups.load())
+        except Exception as e:
+            print(f"❌ Failed to load matches/lineups: {e}")
 
     @app_commands.command(name="setlineup", description="Post lineup for a scheduled match.")
     async def setlineup(self, interaction: discord.Interaction, match_id: int):
         try:
-            data = self.match_sheet.get_all_values()
-            rows = data[1:]
-            match_row = next((row for row in rows if row[8] == str(match_id)), None)
+            match_row = await self.bot.matches.lookup(match_id)
 
             if not match_row:
                 await interaction.response.send_message("❌ Match ID not found.", ephemeral=True)
@@ -142,7 +123,7 @@ class SetLineup(commands.Cog):
                 emoji = discord.utils.get(interaction.guild.emojis, name=name)
                 emoji_map[name] = str(emoji) if emoji else f":{name}:"
 
-            view = CompactLineupView(match_row, emoji_map, self.lineup_sheet, self.archive_sheet, match_id)
+            view = CompactLineupView(match_row, emoji_map, self.bot.lineups, match_id)
             await interaction.response.send_message("🎯 Select up to 6 Shooters and 2 Subs:", view=view, ephemeral=True)
 
         except Exception as e:
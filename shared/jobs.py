@@ -0,0 +1,120 @@
+import os
+import json
+import asyncio
+import traceback
+from datetime import datetime, timedelta, time
+from pathlib import Path
+import pytz
+
+DEFAULT_TIMEZONE = "America/Los_Angeles"
+
+class Job:
+    def __init__(self, name, callback, at, weekday, tz, catch_up):
+        self.name = name
+        self.callback = callback
+        self.at = at
+        self.weekday = weekday
+        self.tz = tz
+        self.catch_up = catch_up
+        self.task = None
+
+    def _deadline_on(self, day):
+        # localize() picks the right UTC offset for that date, so DST changes don't shift the run
+        return self.tz.normalize(self.tz.localize(datetime.combine(day, self.at))).astimezone(pytz.utc)
+
+    def next_run(self, now):
+        day = now.astimezone(self.tz).date()
+        while True:
+            deadline = self._deadline_on(day)
+            if deadline > now and (self.weekday is None or day.weekday() == self.weekday):
+                return deadline
+            day += timedelta(days=1)
+
+    def previous_run(self, now):
+        day = now.astimezone(self.tz).date()
+        while True:
+            deadline = self._deadline_on(day)
+            if deadline <= now and (self.weekday is None or day.weekday() == self.weekday):
+                return deadline
+            day -= timedelta(days=1)
+
+class JobScheduler:
+    def __init__(self, bot, timezone=DEFAULT_TIMEZONE, state_path="job_state.json"):
+        self.bot = bot
+        self.tz = pytz.timezone(timezone)
+        self.state_path = Path(state_path)
+        self.jobs = {}
+        self.started = False
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with self.state_path.open("r") as f:
+                return {name: datetime.fromisoformat(ts) for name, ts in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            json.dump({name: ts.isoformat() for name, ts in self.state.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def register(self, name, callback, at=time(0, 0), weekday=None, timezone=None, catch_up=True):
+        # callback: zero-arg coroutine function; weekday uses datetime.weekday() (Monday = 0)
+        self.unregister(name)
+        tz = pytz.timezone(timezone) if timezone else self.tz
+        job = Job(name, callback, at, weekday, tz, catch_up)
+        self.jobs[name] = job
+        if self.started:
+            job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def unregister(self, name):
+        job = self.jobs.pop(name, None)
+        if job and job.task:
+            job.task.cancel()
+
+    def start(self):
+        self.started = True
+        for job in self.jobs.values():
+            if job.task is None:
+                job.task = asyncio.create_task(self._run(job))
+
+    async def _fire(self, job):
+        try:
+            print(f"⏰ Running scheduled job '{job.name}'")
+            await job.callback()
+        except Exception as e:
+            print(f"❌ Scheduled job '{job.name}' failed: {e}")
+            traceback.print_exc()
+        self.state[job.name] = datetime.now(pytz.utc)
+        try:
+            self._save_state()
+        except Exception as e:
+            print(f"⚠️ Failed to save job state: {e}")
+
+    async def _run(self, job):
+        await self.bot.wait_until_ready()
+        now = datetime.now(pytz.utc)
+        last = self.state.get(job.name)
+        if last is None:
+            # Nothing to catch up on yet; just start the clock
+            self.state[job.name] = now
+            self._save_state()
+        elif job.catch_up and last < job.previous_run(now):
+            print(f"⏰ Catching up missed run of '{job.name}'")
+            await self._fire(job)
+
+        while True:
+            deadline = job.next_run(datetime.now(pytz.utc))
+            # Sleep in bounded chunks so a suspended host or clock jump can't make us oversleep a whole day
+            while True:
+                remaining = (deadline - datetime.now(pytz.utc)).total_seconds()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 900))
+            await self._fire(job)
@@ -0,0 +1,93 @@
+import asyncio
+import bisect
+import discord
+
+METRICS = ["frags", "reactions", "executions"]
+
+def parse_count(value):
+    value = str(value).strip()
+    return int(value) if value.isdigit() else 0
+
+class Leaderboard:
+    def __init__(self, sheets, tab="giveaway", size=10):
+        self.sheets = sheets
+        self.tab = tab
+        self.size = size
+        # lower-cased username -> {"name", "seq", "row", "frags", "reactions", "executions"}
+        self.entries = {}
+        # metric -> ascending list of (-score, seq, key); the first `size` items are the top of that board
+        self.rankings = {metric: [] for metric in METRICS}
+        self.next_seq = 0
+        self.cached_embed = None
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def load(self, force=False):
+        async with self.lock:
+            if self.loaded and not force:
+                return
+            rows = (await self.sheets.read(self.tab))[1:]
+            self.entries = {}
+            self.rankings = {metric: [] for metric in METRICS}
+            self.next_seq = 0
+            for i, row in enumerate(rows, start=2):
+                row = list(row) + [""] * (4 - len(row))
+                entry = self.set(row[0], parse_count(row[1]), parse_count(row[2]), parse_count(row[3]))
+                entry["row"] = i
+            self.loaded = True
+            print(f"🏆 Loaded {len(self.entries)} giveaway entries")
+
+    def _rank_key(self, entry, metric):
+        return (-entry[metric], entry["seq"], entry["name"].lower())
+
+    def set(self, username, frags, reactions, executions):
+        key = username.lower()
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {"name": username, "seq": self.next_seq, "row": None, "frags": 0, "reactions": 0, "executions": 0}
+            self.next_seq += 1
+            self.entries[key] = entry
+        else:
+            for metric in METRICS:
+                ranking = self.rankings[metric]
+                del ranking[bisect.bisect_left(ranking, self._rank_key(entry, metric))]
+        entry.update(frags=frags, reactions=reactions, executions=executions)
+        for metric in METRICS:
+            bisect.insort(self.rankings[metric], self._rank_key(entry, metric))
+        self.cached_embed = None
+        return entry
+
+    def get(self, username):
+        return self.entries.get(username.lower())
+
+    def top(self, metric):
+        return [self.entries[key]["name"] for _, _, key in self.rankings[metric][:self.size]]
+
+    def embed(self):
+        if self.cached_embed is not None:
+            return self.cached_embed
+
+        def format_column(title, names, emoji):
+            lines = [f"**{emoji} {title.upper()}**"]
+            for i, user in enumerate(names):
+                if i == 0:
+                    lines.append(f"<a:BlackCrown:1353482149096853606> **#{i+1} {user}**")
+                elif i == 1:
+                    lines.append(f"<a:WhiteCrown:1353482417893277759> **#{i+1} {user}**")
+                else:
+                    lines.append(f"**#{i+1} {user}**")
+            return "\n\n".join(lines)
+
+        frag_column = format_column("Top Frags", self.top("frags"), "<:CronusZen:1373022628146843671>")
+        react_column = format_column("Top Reactions", self.top("reactions"), "🔁")
+        exec_column = format_column("Top Executions", self.top("executions"), "<a:GhostFaceMurder:1373023142750195862>")
+
+        embed = discord.Embed(title="🏆 **GIVEAWAY LEADERBOARD**", color=discord.Color.red())
+        embed.add_field(name="Top Frags", value=frag_column, inline=True)
+        embed.add_field(name="Top Reactions", value=react_column, inline=True)
+        embed.add_field(name="Top Executions", value=exec_column, inline=True)
+        self.cached_embed = embed
+        return embed
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,112 @@
+import asyncio
+from shared.sheets import append_rows_request, delete_rows_requests
+
+# Column layout shared by the lineups and lineuparchive tabs (see SubmitCompactButton.callback)
+MATCH_ID_COL = 1
+MESSAGE_ID_COL = 12
+CHANNEL_ID_COL = 13
+
+def lineup_entry(row_number, row):
+    row = list(row) + [""] * (CHANNEL_ID_COL + 1 - len(row))
+    return row_number, row[MESSAGE_ID_COL].strip(), row[CHANNEL_ID_COL].strip()
+
+class LineupIndex:
+    def __init__(self, sheets, tab="lineups", archive_tab="lineuparchive"):
+        self.sheets = sheets
+        self.tab = tab
+        self.archive_tab = archive_tab
+        # match_id -> [(row, message_id, channel_id)] for the live lineups tab; rows shift when lineups are deleted
+        self.current = {}
+        self.current_rows = 0
+        # match_id -> latest (row, message_id, channel_id) in the append-only archive
+        self.archive = {}
+        self.archive_rows = 0
+        self.loaded = False
+        # Row numbers are only valid while nobody else is deleting, so every write goes through this
+        self.lock = asyncio.Lock()
+
+    async def load(self, force=False):
+        async with self.lock:
+            if self.loaded and not force:
+                return
+            await self._load()
+
+    async def _load(self):
+        # Callers hold self.lock
+        current, archive = await self.sheets.batch_get([f"'{self.tab}'", f"'{self.archive_tab}'"])
+        self.current = {}
+        self.current_rows = len(current[1:])
+        for i, row in enumerate(current[1:], start=2):
+            if len(row) > MATCH_ID_COL and row[MATCH_ID_COL].strip():
+                self.current.setdefault(row[MATCH_ID_COL].strip(), []).append(lineup_entry(i, row))
+        self.archive = {}
+        self.archive_rows = len(archive[1:])
+        for i, row in enumerate(archive[1:], start=2):
+            if len(row) > MATCH_ID_COL and row[MATCH_ID_COL].strip():
+                self.archive[row[MATCH_ID_COL].strip()] = lineup_entry(i, row)
+        self.loaded = True
+        print(f"📋 Indexed {len(self.current)} lineups and {len(self.archive)} archived lineups")
+
+    async def checked(self, match_id):
+        # Live entries for match_id after confirming column B of each cached row still holds it; hand edits to the tab
+        # shift rows under us, so a mismatch reloads the index before anyone deletes by row number. Callers hold self.lock
+        match_id = str(match_id).strip()
+        entries = self.current.get(match_id, [])
+        if entries:
+            cells = await self.sheets.batch_get([f"'{self.tab}'!B{row}" for row, _, _ in entries])
+            if not all(values and values[0] and values[0][0].strip() == match_id for values in cells):
+                print(f"⚠️ Lineup index out of step with the sheet at match {match_id}; reloading")
+                await self._load()
+        return list(self.current.get(match_id, []))
+
+    def get(self, match_id):
+        return list(self.current.get(str(match_id).strip(), []))
+
+    def previous(self, match_id):
+        # Latest archived lineup post for the match, whether or not it is still live
+        return self.archive.get(str(match_id).strip())
+
+    def forget(self, match_id):
+        # Forget the live rows for match_id and shift everyone below them up
+        removed = self.current.pop(str(match_id).strip(), [])
+        gone = sorted(row for row, _, _ in removed)
+        if gone:
+            for key, entries in self.current.items():
+                self.current[key] = [
+                    (row - sum(1 for g in gone if g < row), msg_id, chan_id) for row, msg_id, chan_id in entries
+                ]
+            self.current_rows -= len(gone)
+        return removed
+
+    async def delete_requests(self, match_id):
+        # deleteDimension requests for the live rows of a match, for callers batching them with other writes
+        # under self.lock; call forget() once the batch has gone through
+        rows = [row for row, _, _ in await self.checked(match_id)]
+        if not rows:
+            return []
+        return delete_rows_requests(await self.sheets.sheet_id(self.tab), rows)
+
+    async def delete(self, match_id):
+        # Remove the live lineup rows for a match in one call; returns the removed entries
+        async with self.lock:
+            rows = [row for row, _, _ in await self.checked(match_id)]
+            await self.sheets.delete_rows(self.tab, rows)
+            return self.forget(match_id)
+
+    async def replace(self, match_id, row):
+        # Delete the old live row(s), append to lineups and append to the archive: a single batchUpdate
+        match_id = str(match_id).strip()
+        async with self.lock:
+            tab_id, archive_id = await asyncio.gather(self.sheets.sheet_id(self.tab), self.sheets.sheet_id(self.archive_tab))
+            old_rows = [r for r, _, _ in await self.checked(match_id)]
+            requests = delete_rows_requests(tab_id, old_rows)
+            requests.append(append_rows_request(tab_id, [row]))
+            requests.append(append_rows_request(archive_id, [row]))
+            await self.sheets.batch_update(requests)
+
+            self.forget(match_id)
+            # appendCells doesn't report where it landed; if this guess is off, checked() catches it before the next delete
+            self.current_rows += 1
+            self.current[match_id] = [lineup_entry(self.current_rows + 1, row)]
+            self.archive_rows += 1
+            self.archive[match_id] = lineup_entry(self.archive_rows + 1, row)
@@ -0,0 +1,108 @@
+import re
+import asyncio
+
+# Column layout of the matches tab (see MatchScheduleModal.on_submit)
+DATE_COL = 2
+MATCH_ID_COL = 8
+
+DATE_PATTERN = re.compile(r"^\s*(\d{1,2})\s*[/\-.]\s*(\d{1,2})(?:\s*[/\-.]\s*(\d{2}|\d{4}))?\s*$")
+
+def parse_match_date(text):
+    # "5/7", "05/07", "5-7", "5/7/2025", "5/7/25" -> (5, 7, year or None)
+    m = DATE_PATTERN.match(str(text))
+    if not m:
+        return None
+    month, day = int(m.group(1)), int(m.group(2))
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    year = m.group(3)
+    if year is not None:
+        year = int(year) + (2000 if len(year) == 2 else 0)
+    return month, day, year
+
+class MatchIndex:
+    def __init__(self, sheets, tab="matches"):
+        self.sheets = sheets
+        self.tab = tab
+        self.header = []
+        # rows[i] mirrors sheet row i + 2
+        self.rows = []
+        self.by_id = {}
+        # (month, day) -> row positions scheduled on that date
+        self.by_date = {}
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def load(self, force=False):
+        async with self.lock:
+            if self.loaded and not force:
+                return
+            values = await self.sheets.read(self.tab)
+            self.header = values[0] if values else []
+            self.rows = [list(row) for row in values[1:]]
+            self._reindex()
+            self.loaded = True
+            print(f"📅 Indexed {len(self.by_id)} scheduled matches")
+
+    def _reindex(self):
+        self.by_id = {}
+        self.by_date = {}
+        for i in range(len(self.rows)):
+            self._index(i)
+
+    def _index(self, i):
+        row = self.rows[i]
+        if len(row) > MATCH_ID_COL and row[MATCH_ID_COL].strip():
+            self.by_id[row[MATCH_ID_COL].strip()] = i
+        parsed = parse_match_date(row[DATE_COL]) if len(row) > DATE_COL else None
+        if parsed:
+            self.by_date.setdefault(parsed[:2], []).append(i)
+
+    def on(self, date):
+        # Every scheduled match whose Date column falls on `date` (a date/datetime); rows without a year match any year
+        rows = []
+        for i in self.by_date.get((date.month, date.day), []):
+            row = self.rows[i]
+            year = parse_match_date(row[DATE_COL])[2]
+            if year is None or year == date.year:
+                rows.append(row)
+        return rows
+
+    def get(self, match_id):
+        i = self.by_id.get(str(match_id).strip())
+        return self.rows[i] if i is not None else None
+
+    async def lookup(self, match_id):
+        # get(), but a miss re-reads the tab once first in case the match was added to the sheet by hand
+        row = self.get(match_id)
+        if row is None:
+            await self.load(force=True)
+            row = self.get(match_id)
+        return row
+
+    def row_number(self, match_id):
+        i = self.by_id.get(str(match_id).strip())
+        return i + 2 if i is not None else None
+
+    def add(self, row, row_number=None):
+        # row_number is where the sheet actually put it (from the append response); callers hold self.lock.
+        # Returns False when the index is out of step with the sheet; the caller reloads once it releases the lock
+        row = [str(v) for v in row]
+        if row_number is not None:
+            if row_number - 2 < len(self.rows):
+                print(f"⚠️ Match index out of step at row {row_number}; reloading")
+                return False
+            # Pad for any rows someone added by hand so positions keep lining up with the sheet
+            while len(self.rows) < row_number - 2:
+                self.rows.append([])
+        self.rows.append(row)
+        self._index(len(self.rows) - 1)
+        return True
+
+    def remove(self, match_id):
+        i = self.by_id.get(str(match_id).strip())
+        if i is None:
+            return None
+        row = self.rows.pop(i)
+        self._reindex()
+        return row
@@ -0,0 +1,126 @@
+import io
+import os
+import json
+import time
+import discord
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from shared.reaper import reap_messages
+
+def url_expiry(url):
+    # Signed CDN links carry ?ex=<hex unix time>; unsigned ones don't expire
+    try:
+        return int(parse_qs(urlparse(url).query)["ex"][0], 16)
+    except (KeyError, IndexError, ValueError):
+        return None
+
+class PromptAsset:
+    def __init__(self, path):
+        # Read once at startup; uploaded from memory only when there's no asset post to reuse
+        self.filename = os.path.basename(path)
+        with open(path, "rb") as f:
+            self.data = f.read()
+
+    def file(self):
+        return discord.File(io.BytesIO(self.data), filename=self.filename)
+
+class PromptBoard:
+    def __init__(self, state_path="prompt_state.json", asset_channel_id=None):
+        self.state_path = Path(state_path)
+        # Where prompt images are uploaded once; unset = the first channel each prompt is posted in
+        self.asset_channel_id = asset_channel_id
+        # name -> {"posts": {channel_id: [message_id, ...]}, "image": {"url", "message_id", "channel_id"}}
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with self.state_path.open("r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    async def on_raw_message_delete(self, payload):
+        # An asset post someone deleted by hand takes its CDN URL with it; upload again next time
+        changed = False
+        for record in self.state.values():
+            image = record.get("image")
+            if image and image.get("message_id") == str(payload.message_id):
+                del record["image"]
+                changed = True
+        if changed:
+            try:
+                self._save_state()
+            except Exception as e:
+                print(f"⚠️ Failed to save prompt state: {e}")
+
+    async def _image(self, bot, record, channel, asset):
+        # The uploaded image lives on its own asset post, which reposts never delete
+        image = record.get("image")
+        if image and "channel_id" in image:
+            expires = url_expiry(image["url"])
+            if expires is None or expires - time.time() > 3600:
+                return image
+            # Signed URL is about to lapse: re-reading the asset post hands out a fresh one, no upload needed
+            try:
+                asset_channel = bot.get_channel(int(image["channel_id"]))
+                msg = await asset_channel.get_partial_message(int(image["message_id"])).fetch()
+                image["url"] = msg.attachments[0].url
+                return image
+            except (discord.NotFound, AttributeError, IndexError):
+                pass
+            except discord.HTTPException as e:
+                print(f"⚠️ Failed to refresh prompt image URL: {e}")
+
+        target = bot.get_channel(self.asset_channel_id) if self.asset_channel_id else None
+        target = target or channel
+        msg = await target.send(file=asset.file())
+        image = {"url": msg.attachments[0].url, "message_id": str(msg.id), "channel_id": str(target.id)}
+        record["image"] = image
+        return image
+
+    async def _legacy_prompts(self, bot, channel):
+        # Prompts posted before message IDs were stored: one last history scan for this channel
+        found = []
+        try:
+            async for msg in channel.history(limit=10):
+                if msg.author.id == bot.user.id and (msg.attachments or msg.components):
+                    found.append(str(msg.id))
+        except Exception as e:
+            print(f"⚠️ Cleanup error: {e}")
+        return found
+
+    async def post(self, bot, name, channel, asset, view):
+        record = self.state.setdefault(name, {"posts": {}})
+        channel_key = str(channel.id)
+        if channel_key in record["posts"]:
+            old_ids = [str(m) for m in record["posts"][channel_key]]
+        else:
+            old_ids = await self._legacy_prompts(bot, channel)
+
+        image = await self._image(bot, record, channel, asset)
+        old_ids = [m for m in old_ids if m != image["message_id"]]
+        if image["channel_id"] == channel_key:
+            # The asset post already shows the image here; the prompt itself is just the button
+            msg = await channel.send(view=view)
+        else:
+            embed = discord.Embed(color=discord.Color.red())
+            embed.set_image(url=image["url"])
+            msg = await channel.send(embed=embed, view=view)
+
+        record["posts"][channel_key] = [str(msg.id)]
+        try:
+            self._save_state()
+        except Exception as e:
+            print(f"⚠️ Failed to save prompt state: {e}")
+
+        await reap_messages(bot, [(channel.id, m) for m in old_ids])
+        return msg
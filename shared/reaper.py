@@ -0,0 +1,73 @@
+import discord
+from datetime import timedelta
+
+# Discord rejects bulk deletes of messages older than 14 days; keep a margin for clock skew
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=10)
+BULK_DELETE_LIMIT = 100
+
+def _single_job(channel, msg_id):
+    async def delete():
+        try:
+            await channel.get_partial_message(msg_id).delete()
+        except discord.NotFound:
+            return 0
+        return 1
+    return delete
+
+def _bulk_job(channel, msg_ids):
+    async def delete():
+        try:
+            await channel.delete_messages([discord.Object(id=m) for m in msg_ids])
+            return len(msg_ids)
+        except discord.HTTPException as e:
+            # Missing Manage Messages or a message aged out mid-flight: fall back to one call per message
+            print(f"⚠️ Bulk delete in #{channel} failed, deleting one by one: {e}")
+            deleted = 0
+            for m in msg_ids:
+                try:
+                    deleted += await _single_job(channel, m)()
+                except discord.HTTPException as e:
+                    print(f"⚠️ Failed to delete message {m}: {e}")
+            return deleted
+    return delete
+
+async def reap_messages(bot, targets):
+    # targets: (channel_id, message_id) pairs. Messages are deleted by ID without fetching them first; per channel,
+    # anything younger than 14 days goes out in bulk-delete calls of up to 100, older ones one at a time.
+    # Returns how many messages were actually deleted.
+    by_channel = {}
+    for chan_id, msg_id in targets:
+        if str(chan_id).strip().isdigit() and str(msg_id).strip().isdigit():
+            by_channel.setdefault(int(chan_id), set()).add(int(msg_id))
+
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    jobs = []
+    for chan_id, msg_ids in by_channel.items():
+        channel = bot.get_channel(chan_id)
+        if channel is None:
+            print(f"⚠️ Channel {chan_id} not found; skipping {len(msg_ids)} message(s)")
+            continue
+        route = f"messages:{chan_id}"
+        msg_ids = sorted(msg_ids)
+        if hasattr(channel, "delete_messages"):
+            young = [m for m in msg_ids if discord.utils.snowflake_time(m) > cutoff]
+        else:
+            young = []
+        bulk = set(young)
+        old = [m for m in msg_ids if m not in bulk]
+        # A lone message is cheaper as a plain delete
+        if len(young) == 1:
+            old += young
+            young = []
+        for i in range(0, len(young), BULK_DELETE_LIMIT):
+            jobs.append((route, _bulk_job(channel, young[i:i + BULK_DELETE_LIMIT])))
+        for m in old:
+            jobs.append((route, _single_job(channel, m)))
+
+    deleted = 0
+    for result in await bot.rest.run(jobs):
+        if isinstance(result, Exception):
+            print(f"⚠️ Failed to delete message: {result}")
+        else:
+            deleted += result
+    return deleted
@@ -0,0 +1,45 @@
+import time
+import asyncio
+
+class RestScheduler:
+    def __init__(self, max_concurrency=8, per_route=2):
+        # discord.py already waits out 429s per bucket; this just keeps bulk jobs from piling onto one bucket
+        self.global_limit = asyncio.Semaphore(max_concurrency)
+        self.per_route = per_route
+        self.routes = {}
+
+    def route(self, key):
+        sem = self.routes.get(key)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_route)
+            self.routes[key] = sem
+        return sem
+
+    async def submit(self, route_key, factory):
+        async with self.route(route_key), self.global_limit:
+            return await factory()
+
+    async def run(self, jobs, progress=None, progress_interval=1.5):
+        # jobs: (route_key, zero-arg coroutine function) pairs; results come back in order, failures as exceptions
+        jobs = list(jobs)
+        total = len(jobs)
+        done = 0
+        last_report = 0.0
+
+        async def tracked(route_key, factory):
+            nonlocal done, last_report
+            try:
+                return await self.submit(route_key, factory)
+            except Exception as e:
+                return e
+            finally:
+                done += 1
+                now = time.monotonic()
+                if progress and (done == total or now - last_report >= progress_interval):
+                    last_report = now
+                    try:
+                        await progress(done, total)
+                    except Exception as e:
+                        print(f"⚠️ Progress update failed: {e}")
+
+        return await asyncio.gather(*(tracked(key, factory) for key, factory in jobs))
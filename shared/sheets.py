@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import base64
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import gspread
+from dotenv import load_dotenv
+from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+def appended_start_row(response):
+    # "giveaway!A12:D13" -> 12, from an append_rows response
+    match = re.search(r"![A-Z]+(\d+)", response.get("updates", {}).get("updatedRange", ""))
+    return int(match.group(1)) if match else None
+
+def merge_row_ranges(row_numbers):
+    # {2, 3, 4, 9} -> [(2, 4), (9, 9)] using 1-based inclusive sheet row numbers
+    ranges = []
+    for row in sorted(set(row_numbers)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(r) for r in ranges]
+
+def cell_value(v):
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return {"numberValue": v}
+    return {"stringValue": str(v)}
+
+def row_data(values):
+    # Cells written as-is, the same as a RAW values write, for updateCells/appendCells requests
+    return {"values": [{"userEnteredValue": cell_value(v)} for v in values]}
+
+def update_row_request(sheet_id, row_number, values):
+    return {
+        "updateCells": {
+            "rows": [row_data(values)],
+            "fields": "userEnteredValue",
+            "start": {"sheetId": sheet_id, "rowIndex": row_number - 1, "columnIndex": 0},
+        }
+    }
+
+def append_rows_request(sheet_id, rows):
+    return {"appendCells": {"sheetId": sheet_id, "rows": [row_data(r) for r in rows], "fields": "userEnteredValue"}}
+
+def delete_rows_requests(sheet_id, row_numbers):
+    # Contiguous runs become a single deleteDimension each, bottom-up so earlier deletions don't shift later ones
+    return [
+        {
+            "deleteDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end}
+            }
+        }
+        for start, end in reversed(merge_row_ranges(row_numbers))
+    ]
+
+class SheetsService:
+    def __init__(self, spreadsheet_name="AOS", pool_size=4):
+        load_dotenv()
+        creds_b64 = os.getenv("GOOGLE_SHEETS_CREDS_B64")
+        creds_json = json.loads(base64.b64decode(creds_b64.encode("utf-8")).decode("utf-8"))
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, SCOPE)
+
+        # One authorized client = one token cache and one keep-alive HTTP session for the whole bot
+        self.client = gspread.authorize(creds)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+
+        self.spreadsheet = self.client.open(spreadsheet_name)
+        self._worksheets = {}
+
+        # gspread is blocking; every call goes through this bounded pool so the event loop never waits on Google
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sheets")
+        print(f"📗 Opened spreadsheet '{spreadsheet_name}'")
+
+    @property
+    def session(self):
+        # gspread 6 keeps the requests session on client.http_client, gspread 5 on the client itself
+        return getattr(self.client, "http_client", self.client).session
+
+    def worksheet(self, tab):
+        ws = self._worksheets.get(tab)
+        if ws is None:
+            ws = self.spreadsheet.worksheet(tab)
+            self._worksheets[tab] = ws
+        return ws
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def call(self, tab, method, *args, **kwargs):
+        return await self.run(lambda: getattr(self.worksheet(tab), method)(*args, **kwargs))
+
+    async def read(self, tab):
+        return await self.call(tab, "get_all_values")
+
+    async def batch_get(self, ranges):
+        # Several ranges (whole tabs or A1 ranges) in one values:batchGet; one list of rows per range, in order
+        response = await self.run(self.spreadsheet.values_batch_get, list(ranges))
+        return [vr.get("values", []) for vr in response.get("valueRanges", [])]
+
+    async def records(self, tab):
+        return await self.call(tab, "get_all_records")
+
+    async def column(self, tab, col):
+        return await self.call(tab, "col_values", col)
+
+    async def append(self, tab, rows, **kwargs):
+        return await self.call(tab, "append_rows", rows, **kwargs)
+
+    async def update(self, tab, range_name, values, **kwargs):
+        return await self.call(tab, "update", range_name=range_name, values=values, **kwargs)
+
+    async def update_ranges(self, tab, data, **kwargs):
+        # data: [{"range": "B2", "values": [[...]]}, ...] written in one values:batchUpdate
+        if not data:
+            return None
+        return await self.call(tab, "batch_update", data, **kwargs)
+
+    async def update_cell(self, tab, row, col, value):
+        return await self.call(tab, "update_cell", row, col, value)
+
+    async def batch_update(self, requests):
+        if not requests:
+            return None
+        return await self.run(self.spreadsheet.batch_update, {"requests": requests})
+
+    async def sheet_id(self, tab):
+        return (await self.run(self.worksheet, tab)).id
+
+    async def delete_rows(self, tab, row_numbers):
+        # Any number of rows in one API call
+        if not row_numbers:
+            return None
+        return await self.batch_update(delete_rows_requests(await self.sheet_id(tab), row_numbers))
+
+    async def clear(self, tab):
+        return await self.call(tab, "clear")
+
+    async def clear_ranges(self, tab, ranges):
+        return await self.call(tab, "batch_clear", ranges)
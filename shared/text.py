@@ -0,0 +1,18 @@
+MESSAGE_LIMIT = 2000
+
+def chunk_lines(lines, limit=MESSAGE_LIMIT, header=None):
+    # Pack whole lines into as few messages as possible, each at most `limit` characters
+    chunks = []
+    current = header or ""
+    for line in lines:
+        if len(line) > limit:
+            line = line[:limit - 1] + "…"
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks